@@ -0,0 +1,66 @@
+"""듣기평가 음원 합치기: 기존 pydub 반복 덧붙이기와 utils.audio 의 미리 할당한 NumPy 버퍼 비교.
+
+실행: python benchmarks/bench_audio.py
+
+클립은 모의 서버와 같은 방식으로 만든 PCM 이므로 디코딩 시간은 양쪽 모두 빠진다.
+인코딩은 ffmpeg 가 있으면 mp3, 없으면 wav 로 잰다.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import make_script  # noqa: E402
+from mock_openai import fake_pcm  # noqa: E402
+from utils.audio import SAMPLE_RATE, assemble_pcm, encode, output_format  # noqa: E402
+from utils.script_parser import iter_utterances, parse_script  # noqa: E402
+
+QUESTION_COUNTS = [20, 60]
+INTERLINE_MS = 200
+INTERNUM_S = 5
+
+
+def gaps(utterances):
+    result = [0]
+    for previous, utterance in zip(utterances, utterances[1:]):
+        result.append(INTERLINE_MS if previous.question == utterance.question else INTERNUM_S * 1000)
+    return result
+
+
+def legacy_assemble(clips, gaps_ms):
+    # 기존 페이지처럼 무음과 클립을 AudioSegment 에 하나씩 더함 (더할 때마다 전체를 복사)
+    from pydub import AudioSegment
+
+    combined = AudioSegment.empty()
+    for clip, gap_ms in zip(clips, gaps_ms):
+        if gap_ms:
+            combined += AudioSegment.silent(duration=gap_ms, frame_rate=SAMPLE_RATE)
+        combined += AudioSegment(data=clip, sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+    return combined
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    fmt = output_format()
+    print(f"{'questions':>9} {'clips':>6} {'audio (min)':>12} {'legacy (s)':>11} {'buffer (s)':>11} {'speedup':>8} {f'encode {fmt} (s)':>16}")
+    for count in QUESTION_COUNTS:
+        utterances = list(iter_utterances(parse_script(make_script(count))))
+        clips = [fake_pcm(u.text) for u in utterances]
+        gaps_ms = gaps(utterances)
+        legacy_time, legacy = timed(lambda: legacy_assemble(clips, gaps_ms))
+        new_time, buffer = timed(lambda: assemble_pcm(clips, gaps_ms))
+        # 무음 길이를 반올림하는 방식만 다를 수 있으므로 길이는 1ms 단위까지 비교
+        assert abs(len(legacy.raw_data) // 2 - len(buffer)) <= len(clips) * SAMPLE_RATE // 1000
+        encode_time, _ = timed(lambda: encode(buffer, fmt))
+        minutes = len(buffer) / SAMPLE_RATE / 60
+        print(f"{count:>9} {len(clips):>6} {minutes:>12.1f} {legacy_time:>11.3f} {new_time:>11.3f} {legacy_time / new_time:>7.1f}x {encode_time:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
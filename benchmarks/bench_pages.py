@@ -0,0 +1,193 @@
+"""각 페이지를 Streamlit AppTest 로 실행해 모의 OpenAI 서버에 대해 지연 시간과 요청량을 잰다.
+
+실행: python benchmarks/bench_pages.py [--scenarios award pdf chat lesson chart listening] [--latency 0.2] [--json out.json]
+
+시나리오마다 첫 화면 표시 시간, 상호작용 전체 시간, 요청 수, 오류 수, 프롬프트 크기(글자 수)를 보고한다.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+
+from fixtures import make_pdf, make_roster, make_scores_csv, make_script  # noqa: E402
+from mock_openai import MockOpenAIServer  # noqa: E402
+
+PAGES = {
+    "lesson": "1_설계안_만들기.py",
+    "chat": "2. ChatGPT(파일첨부, 그림그리기 X).py",
+    "pdf": "pdf요약하고채팅하기(사용은 가능).py",
+    "award": "모범상.py",
+    "chart": "챗봇 차트 생성기.py",
+    "listening": "영어리스닝 대본 만들기(미완성).py",
+}
+APP_TIMEOUT = 600
+
+
+def new_app(page, server):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(APP_DIR, "pages", PAGES[page]), default_timeout=APP_TIMEOUT)
+    at.secrets["OPENAI"] = {"OPENAI_API_KEY": "mock-key", "BASE_URL": server.url, "MAX_RETRIES": 4}
+    return at
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def click(at, label):
+    next(button for button in at.button if button.label == label).click().run()
+
+
+def wait_for_documents(poll=0.05):
+    """PDF 페이지의 백그라운드 텍스트 추출이 모두 끝날 때까지 기다린다."""
+    from utils.document_store import get_document_store
+
+    while get_document_store().stats()["extracting"]:
+        time.sleep(poll)
+
+
+def wait_for_job(at, poll=0.05):
+    """모범상 페이지의 백그라운드 추천서 작업이 끝날 때까지 기다린다."""
+    from utils.job_queue import get_job_runner
+
+    job_id = at.session_state["job"][0]
+    while get_job_runner().is_running(job_id):
+        time.sleep(poll)
+
+
+def scenario_award(server, students=30):
+    at = new_app("award", server)
+    at.session_state["roster"] = pd.DataFrame(make_roster(students))
+    first = timed(at.run)
+    steps = {"generate": timed(lambda: click(at, "생성"))}
+    # 추천서는 백그라운드 작업으로 만들어지므로 끝날 때까지 걸린 시간을 따로 잼
+    steps["background"] = timed(lambda: wait_for_job(at))
+    at.run()
+    return at, first, steps
+
+
+def scenario_pdf(server, pages=300, questions=3):
+    at = new_app("pdf", server)
+    first = timed(at.run)
+    pdf = make_pdf(pages)
+    steps = {"upload": timed(lambda: at.file_uploader[0].set_value(("handout.pdf", pdf, "application/pdf")).run())}
+    # 추출은 백그라운드에서 진행되므로 끝날 때까지 걸린 시간을 따로 잼
+    steps["extract"] = timed(wait_for_documents)
+    for i in range(questions):
+        steps[f"question_{i + 1}"] = timed(lambda: at.text_input[0].set_value(f"Page {i * 50 + 7} 의 실험 내용을 설명해 주세요 ({i})").run())
+    return at, first, steps
+
+
+def scenario_chat(server, turns=50):
+    at = new_app("chat", server)
+    first = timed(at.run)
+    steps = {}
+    for i in range(turns):
+        steps[f"turn_{i + 1}"] = timed(lambda: at.chat_input[0].set_value(f"{i + 1}번째 질문입니다. 수업 활동 아이디어를 자세히 알려 주세요.").run())
+    return at, first, steps
+
+
+def scenario_lesson(server):
+    at = new_app("lesson", server)
+    first = timed(at.run)
+    at.text_input[0].set_value("과학")
+    at.text_input[1].set_value("광합성")
+    at.text_input[2].set_value("빛의 세기와 광합성")
+    # 같은 요청을 두 번 보내 디스크 캐시 적중 시간도 함께 잰다
+    steps = {"submit_cold": timed(lambda: click(at, "Submit")), "submit_cached": timed(lambda: click(at, "Submit"))}
+    return at, first, steps
+
+
+def scenario_chart(server, rows=5000):
+    at = new_app("chart", server)
+    first = timed(at.run)
+    steps = {"upload": timed(lambda: at.sidebar.file_uploader[0].set_value(("scores.csv", make_scores_csv(rows), "text/csv")).run())}
+    at.sidebar.selectbox[0].set_value("히스토그램+도수분포다각형").run()
+    # 같은 설정으로 두 번 그려 차트 캐시 적중 시간도 함께 잰다
+    steps["chart_cold"] = timed(lambda: click(at, "차트 생성"))
+    steps["chart_cached"] = timed(lambda: click(at, "차트 생성"))
+    steps["batch_zip"] = timed(lambda: click(at, "ZIP 만들기"))
+    return at, first, steps
+
+
+def scenario_listening(server, questions=10):
+    at = new_app("listening", server)
+    first = timed(at.run)
+    at.text_area[0].set_value(make_script(questions))
+    # 같은 대본을 두 번 만들어 음성 클립 캐시 적중 시간도 함께 잰다
+    steps = {"generate_cold": timed(lambda: click(at, "🔊 음원 생성하기")), "generate_cached": timed(lambda: click(at, "🔊 음원 생성하기"))}
+    return at, first, steps
+
+
+SCENARIOS = {
+    "award": scenario_award,
+    "pdf": scenario_pdf,
+    "chat": scenario_chat,
+    "lesson": scenario_lesson,
+    "chart": scenario_chart,
+    "listening": scenario_listening,
+}
+
+
+def run_scenario(name, server):
+    server.reset_stats()
+    at, first, steps = SCENARIOS[name](server)
+    stats = server.snapshot()
+    prompt_chars = stats["prompt_chars"] or [0]
+    return {
+        "scenario": name,
+        "first_render_s": round(first, 3),
+        "wall_s": round(sum(steps.values()), 3),
+        "slowest_step_s": round(max(steps.values()), 3),
+        "requests": stats["requests"],
+        "errors": stats["errors"],
+        "max_prompt_chars": max(prompt_chars),
+        "last_prompt_chars": prompt_chars[-1],
+        "exceptions": [str(e.value) for e in at.exception],
+        "steps": {key: round(value, 3) for key, value in steps.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이지별 오프라인 벤치마크")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.2, help="모의 서버 응답 지연(초)")
+    parser.add_argument("--chunk-interval", type=float, default=0.01, help="스트리밍 조각 간격(초)")
+    parser.add_argument("--chunks", type=int, default=40, help="응답 조각 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/500 오류 주입 확률")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    # 실제 앱의 디스크 캐시, 데이터, 호출 기록을 건드리지 않도록 임시 폴더 사용
+    os.environ["APP_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-cache-")
+    os.environ["APP_DATA_DIR"] = tempfile.mkdtemp(prefix="bench-data-")
+    os.environ["APP_LOG_DIR"] = tempfile.mkdtemp(prefix="bench-logs-")
+
+    results = []
+    with MockOpenAIServer(latency=args.latency, chunk_interval=args.chunk_interval, chunk_count=args.chunks, error_rate=args.error_rate) as server:
+        for name in args.scenarios:
+            results.append(run_scenario(name, server))
+
+    print(f"{'scenario':<9} {'first(s)':>9} {'wall(s)':>9} {'slowest(s)':>11} {'requests':>9} {'errors':>7} {'max prompt':>11} {'last prompt':>12}")
+    for r in results:
+        print(f"{r['scenario']:<9} {r['first_render_s']:>9.3f} {r['wall_s']:>9.3f} {r['slowest_step_s']:>11.3f} {r['requests']:>9} {r['errors']:>7} {r['max_prompt_chars']:>11} {r['last_prompt_chars']:>12}")
+        for exception in r["exceptions"]:
+            print(f"  ! {exception}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""듣기평가 대본 파싱: 페이지에 있던 기존 여러 단계 구현과 utils.script_parser 비교.
+
+실행: python benchmarks/bench_script_parser.py
+"""
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import make_script  # noqa: E402
+from utils.script_parser import iter_utterances, parse_script  # noqa: E402
+
+# 시험지 수 (한 부에 20문제)
+BOOKLETS = [1, 10, 100]
+QUESTIONS_PER_BOOKLET = 20
+
+
+# 듣기평가 페이지에 있던 기존 구현
+def is_input_exist(text):
+    pattern = re.compile(r'[a-zA-Z가-힣]')
+    return not bool(pattern.search(text))
+
+
+def which_eng_kor(input_s):
+    count = Counter(input_s)
+    k_count = sum(count[c] for c in count if ord('가') <= ord(c) <= ord('힣'))
+    e_count = sum(count[c] for c in count if 'a' <= c.lower() <= 'z')
+    return "ko" if k_count > e_count else "en"
+
+
+def extract_question(text):
+    match = re.match(r'(\d{1,2}\s*\.?\s*번?)\s*(.*)', text)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return None, text.lstrip()
+
+
+def merge_lines(lines):
+    merged = []
+    current_sentence = ""
+    for line in lines:
+        line = line.strip()
+        current_sentence += " " + line
+        if line.endswith('.') or line.endswith('?') or line.endswith('!'):
+            merged.append(current_sentence.strip())
+            current_sentence = ""
+    if current_sentence:
+        merged.append(current_sentence.strip())
+    return merged
+
+
+def legacy_parse_script(text):
+    utterances = []
+    question = 0
+    gender = "female"
+    for raw in text.splitlines():
+        if is_input_exist(raw):
+            continue
+        number, rest = extract_question(raw)
+        if number:
+            question += 1
+            utterances.append({"question": question, "gender": gender, "lines": [f"{number} {rest}".strip()]})
+            continue
+        speaker = re.match(r'\s*([MWmw])\s*:\s*(.*)', raw)
+        if speaker:
+            gender = "male" if speaker.group(1).upper() == "M" else "female"
+            utterances.append({"question": question, "gender": gender, "lines": [speaker.group(2)]})
+        elif utterances and utterances[-1]["question"] == question:
+            utterances[-1]["lines"].append(raw)
+        else:
+            utterances.append({"question": question, "gender": gender, "lines": [raw]})
+    for utterance in utterances:
+        utterance["text"] = " ".join(merge_lines(utterance.pop("lines")))
+        utterance["language"] = which_eng_kor(utterance["text"])
+    return utterances
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    # 한 부 안에서만 번호가 이어지므로 같은 부를 여러 번 이어 붙여 크기를 늘림
+    booklet = make_script(QUESTIONS_PER_BOOKLET)
+    print(f"{'booklets':>9} {'lines':>7} {'legacy (ms)':>12} {'parser (ms)':>12} {'speedup':>8}")
+    for count in BOOKLETS:
+        text = "\n".join([booklet] * count)
+        legacy_time, legacy = best_of(lambda: legacy_parse_script(text))
+        new_time, parsed = best_of(lambda: parse_script(text))
+        if count == 1:
+            # 기존 구현과 같은 발화 목록을 만드는지 확인
+            assert [(u["gender"], u["language"], u["text"]) for u in legacy] == [(u.gender, u.language, u.text) for u in iter_utterances(parsed)]
+        print(f"{count:>9} {text.count(chr(10)) + 1:>7} {legacy_time * 1000:>12.2f} {new_time * 1000:>12.2f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
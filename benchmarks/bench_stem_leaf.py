@@ -0,0 +1,51 @@
+"""줄기와 잎 그림: 기존 pandas groupby 구현과 utils.stem_leaf 비교.
+
+실행: python benchmarks/bench_stem_leaf.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.stem_leaf import stem_and_leaf  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+STEM_UNIT = 10
+
+
+def legacy_stem_and_leaf(series, stem_unit):
+    # 차트 생성기 페이지에 있던 기존 구현
+    df = series.dropna()
+    stems = (df // stem_unit).astype(int)
+    leaves = (df % stem_unit).astype(int)
+    stem_leaf = pd.DataFrame({'줄기': stems, '잎': leaves})
+    stem_leaf.sort_values(by=['줄기', '잎'], inplace=True)
+    return stem_leaf.groupby('줄기')['잎'].apply(lambda x: ' '.join(x.astype(str))).reset_index()
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for size in SIZES:
+        series = pd.Series(rng.integers(0, 100, size))
+        legacy_time, legacy = best_of(lambda: legacy_stem_and_leaf(series, STEM_UNIT))
+        new_time, new = best_of(lambda: stem_and_leaf(series, STEM_UNIT))
+        assert legacy['잎'].tolist() == new['잎'].tolist()
+        print(f"{size:>10} {legacy_time:>12.3f} {new_time:>15.3f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""벤치마크/부하 테스트용 입력 데이터 생성."""
+import numpy as np
+
+LOREM = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. "
+    "Students compare the rate of reaction under different light intensities and record the results. "
+    "The teacher asks each group to explain why the amount of oxygen changes over time."
+)
+
+
+def make_pdf(num_pages, lines_per_page=30):
+    """외부 라이브러리 없이 텍스트만 있는 num_pages 쪽짜리 PDF 바이트를 만든다."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(num_pages):
+        lines = [f"Page {page + 1} line {i + 1}: {LOREM[(i * 37) % 120:(i * 37) % 120 + 80]}" for i in range(lines_per_page)]
+        text = "".join(f"({line}) Tj T* " for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text}ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode("ascii"))
+        page_ids.append(len(objects))
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {num_pages} >>".encode("ascii")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_roster(num_students):
+    return [
+        {"student_name": f"학생{i + 1}", "award_name": "모범상", "student_quality": "친구를 잘 돕고 수업 태도가 성실함"}
+        for i in range(num_students)
+    ]
+
+
+def make_scores_csv(num_rows, num_columns=5, seed=0):
+    rng = np.random.default_rng(seed)
+    header = ",".join(f"과목{i + 1}" for i in range(num_columns))
+    rows = [",".join(str(v) for v in row) for row in rng.integers(30, 101, (num_rows, num_columns))]
+    return ("\n".join([header] + rows)).encode("utf-8")
+
+
+def make_script(num_questions, turns=6):
+    """문제마다 한국어 지시문과 M/W 가 번갈아 말하는 영어 대화가 있는 듣기평가 대본."""
+    lines = ["지금부터 영어 듣기평가를 시작하겠습니다. 문제지를 확인해 주시기 바랍니다."]
+    for q in range(1, num_questions + 1):
+        lines.append(f"{q}번 대화를 듣고, 남자가 할 일로 가장 적절한 것을 고르시오.")
+        for turn in range(turns):
+            speaker = "M" if turn % 2 == 0 else "W"
+            lines.append(f"{speaker}: {LOREM[(turn * 41 + q) % 150:(turn * 41 + q) % 150 + 60]}")
+            lines.append("and we will check it together tomorrow.")
+    return "\n".join(lines)
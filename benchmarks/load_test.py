@@ -0,0 +1,209 @@
+"""여러 사용자가 동시에 접속한 상황을 흉내 내 모의 OpenAI 서버에 대해 부하 테스트를 한다.
+
+실행: python benchmarks/load_test.py [--sessions 1 5 10 20] [--flows lesson pdf chart] [--latency 0.2] [--json out.json]
+
+동시 세션 수(N)를 늘려 가며 단계마다 N 개의 세션을 스레드로 동시에 실행한다.
+세션 하나는 실제 Streamlit 서버처럼 같은 프로세스 안에서 AppTest 인스턴스 하나로 돌아가므로
+st.cache_data / st.cache_resource 와 공유 OpenAI 클라이언트가 세션 사이에 공유된다.
+단계마다 처리량(흐름/초), 흐름 지연 p50/p95/p99, 실패 수, 모의 서버 요청 수, 프로세스 RSS 를 보고한다.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+
+from bench_pages import APP_TIMEOUT, click, timed  # noqa: E402
+from fixtures import make_pdf, make_scores_csv  # noqa: E402
+from mock_openai import MockOpenAIServer  # noqa: E402
+
+PAGES = {
+    "lesson": "1_설계안_만들기.py",
+    "pdf": "pdf요약하고채팅하기(사용은 가능).py",
+    "chart": "챗봇 차트 생성기.py",
+}
+TOPICS = [("과학", "광합성", "빛의 세기와 광합성"), ("수학", "함수", "일차함수의 그래프"), ("사회", "지도", "위도와 경도"), ("국어", "시", "비유 표현 찾기")]
+
+
+def install_secrets(server):
+    """모든 세션이 같은 secrets 를 보도록 전역 st.secrets 를 한 번만 바꿔 둔다.
+
+    AppTest.secrets 를 쓰면 실행할 때마다 전역 st.secrets 를 바꿨다가 되돌리므로
+    여러 스레드에서 동시에 실행하면 다른 세션의 secrets 가 사라질 수 있다.
+    """
+    import streamlit as st
+    from streamlit.runtime.secrets import Secrets
+
+    secrets = Secrets()
+    secrets._secrets = {"OPENAI": {"OPENAI_API_KEY": "mock-key", "BASE_URL": server.url, "MAX_RETRIES": 4}}
+    st.secrets = secrets
+
+
+def new_app(flow):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(os.path.join(APP_DIR, "pages", PAGES[flow]), default_timeout=APP_TIMEOUT)
+
+
+def flow_lesson(session, inputs):
+    # 세션마다 다른 주제를 골라 캐시 적중과 미스가 섞이도록 함
+    at = new_app("lesson")
+    at.run()
+    subject, unit, topic = TOPICS[session % len(TOPICS)]
+    at.text_input[0].set_value(subject)
+    at.text_input[1].set_value(unit)
+    at.text_input[2].set_value(f"{topic} ({session})")
+    click(at, "Submit")
+    return at
+
+
+def flow_pdf(session, inputs):
+    # 같은 학습지를 여러 교사가 올리는 상황: 문서 처리는 캐시를 공유하고 질문은 세션마다 다름
+    at = new_app("pdf")
+    at.run()
+    at.file_uploader[0].set_value(("handout.pdf", inputs["pdf"], "application/pdf")).run()
+    # 추출은 백그라운드에서 진행되므로 이 세션의 문서가 다 추출될 때까지 기다린 뒤 질문
+    document = at.session_state["document"]
+    while not document.complete and document.error is None:
+        time.sleep(0.05)
+    for i in range(inputs["questions"]):
+        at.text_input[0].set_value(f"Page {(session * 7 + i * 11) % inputs['pdf_pages'] + 1} 의 실험 내용을 설명해 주세요").run()
+    return at
+
+
+def flow_chart(session, inputs):
+    at = new_app("chart")
+    at.run()
+    at.file_uploader[0].set_value(("scores.csv", inputs["csv"], "text/csv")).run()
+    click(at, "차트 생성")
+    return at
+
+
+FLOWS = {"lesson": flow_lesson, "pdf": flow_pdf, "chart": flow_chart}
+
+
+def rss_mb():
+    """현재 프로세스의 RSS(MB). /proc 이 없으면 최대 RSS 로 대신한다."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_session(session, flow, inputs, start_barrier):
+    start_barrier.wait()
+    error = None
+    try:
+        holder = {}
+        elapsed = timed(lambda: holder.update(at=FLOWS[flow](session, inputs)))
+        exceptions = [str(e.value) for e in holder["at"].exception]
+        if exceptions:
+            error = exceptions[0]
+    except Exception as e:
+        elapsed = None
+        error = f"{type(e).__name__}: {e}"
+    return {"session": session, "flow": flow, "elapsed_s": elapsed, "error": error}
+
+
+def run_level(num_sessions, flows, inputs, server):
+    """num_sessions 개의 세션을 동시에 시작해 모두 끝날 때까지의 결과를 모은다."""
+    server.reset_stats()
+    start_barrier = threading.Barrier(num_sessions)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_sessions) as executor:
+        futures = [executor.submit(run_session, i, flows[i % len(flows)], inputs, start_barrier) for i in range(num_sessions)]
+        sessions = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+    stats = server.snapshot()
+
+    latencies = np.array([s["elapsed_s"] for s in sessions if s["elapsed_s"] is not None and s["error"] is None])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies.size else (float("nan"),) * 3
+    per_flow = {}
+    for flow in flows:
+        flow_latencies = [s["elapsed_s"] for s in sessions if s["flow"] == flow and s["elapsed_s"] is not None]
+        if flow_latencies:
+            per_flow[flow] = round(float(np.median(flow_latencies)), 3)
+    return {
+        "sessions": num_sessions,
+        "wall_s": round(wall, 3),
+        "throughput_flows_per_s": round(latencies.size / wall, 3),
+        "p50_s": round(float(p50), 3),
+        "p95_s": round(float(p95), 3),
+        "p99_s": round(float(p99), 3),
+        "failed": sum(s["error"] is not None for s in sessions),
+        "requests": stats["requests"],
+        "server_errors": stats["errors"],
+        "rss_mb": round(rss_mb(), 1),
+        "median_by_flow_s": per_flow,
+        "errors": sorted({s["error"] for s in sessions if s["error"]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 세션 부하 테스트")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 5, 10, 20], help="단계별 동시 세션 수")
+    parser.add_argument("--flows", nargs="+", default=list(FLOWS), choices=list(FLOWS), help="세션에 차례로 배정할 사용 흐름")
+    parser.add_argument("--pdf-pages", type=int, default=40, help="PDF 흐름에서 올릴 문서 쪽수")
+    parser.add_argument("--questions", type=int, default=2, help="PDF 흐름에서 세션마다 묻는 질문 수")
+    parser.add_argument("--csv-rows", type=int, default=2000, help="차트 흐름에서 올릴 CSV 행 수")
+    parser.add_argument("--latency", type=float, default=0.2, help="모의 서버 응답 지연(초)")
+    parser.add_argument("--chunk-interval", type=float, default=0.01, help="스트리밍 조각 간격(초)")
+    parser.add_argument("--chunks", type=int, default=40, help="응답 조각 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/500 오류 주입 확률")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    # 스레드마다 찍히는 bare mode 경고가 결과를 가리지 않도록 함
+    from streamlit.logger import set_log_level
+
+    set_log_level("error")
+
+    # 실제 앱의 디스크 캐시, 데이터, 로그를 건드리지 않도록 임시 폴더 사용
+    os.environ["APP_CACHE_DIR"] = tempfile.mkdtemp(prefix="load-cache-")
+    os.environ["APP_DATA_DIR"] = tempfile.mkdtemp(prefix="load-data-")
+    os.environ["APP_LOG_DIR"] = tempfile.mkdtemp(prefix="load-logs-")
+
+    inputs = {
+        "pdf": make_pdf(args.pdf_pages),
+        "pdf_pages": args.pdf_pages,
+        "questions": args.questions,
+        "csv": make_scores_csv(args.csv_rows),
+    }
+    results = []
+    baseline_rss = rss_mb()
+    with MockOpenAIServer(latency=args.latency, chunk_interval=args.chunk_interval, chunk_count=args.chunks, error_rate=args.error_rate) as server:
+        install_secrets(server)
+        for num_sessions in args.sessions:
+            results.append(run_level(num_sessions, args.flows, inputs, server))
+            r = results[-1]
+            print(f"N={r['sessions']:<3} done in {r['wall_s']:.1f}s", file=sys.stderr)
+
+    print(f"baseline RSS: {baseline_rss:.1f} MB")
+    print(f"{'N':>4} {'wall(s)':>8} {'flows/s':>8} {'p50(s)':>7} {'p95(s)':>7} {'p99(s)':>7} {'failed':>7} {'requests':>9} {'RSS(MB)':>8}  median by flow")
+    for r in results:
+        by_flow = " ".join(f"{flow}={value:.2f}" for flow, value in r["median_by_flow_s"].items())
+        print(f"{r['sessions']:>4} {r['wall_s']:>8.2f} {r['throughput_flows_per_s']:>8.2f} {r['p50_s']:>7.2f} {r['p95_s']:>7.2f} {r['p99_s']:>7.2f} {r['failed']:>7} {r['requests']:>9} {r['rss_mb']:>8.1f}  {by_flow}")
+        for error in r["errors"]:
+            print(f"  ! {error}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"baseline_rss_mb": round(baseline_rss, 1), "levels": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
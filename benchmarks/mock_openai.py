@@ -0,0 +1,206 @@
+"""API 비용 없이 페이지를 측정하기 위한 OpenAI 호환 모의 서버.
+
+/v1/chat/completions (일반/스트리밍) 과 /v1/audio/speech 를 흉내 낸다.
+응답 지연, 스트리밍 조각 간격, 오류(429/500) 비율을 설정할 수 있고 요청 수와 프롬프트 크기를 기록한다.
+
+단독 실행: python benchmarks/mock_openai.py --port 8900 --latency 0.5
+앱을 붙이려면 secrets.toml 의 [OPENAI] 에 BASE_URL = "http://127.0.0.1:8900/v1" 을 넣는다.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 모의 응답 문장 (조각 단위로 나누어 보냄)
+REPLY_WORDS = "이것은 성능 측정을 위한 모의 응답입니다 .".split()
+# 128 바이트짜리 가짜 MP3 프레임
+FAKE_AUDIO = b"\xff\xfb\x90\x00" + b"\x00" * 124
+# response_format="pcm" 요청에는 글자당 이 길이(초)만큼의 24kHz 16비트 모노 신호를 돌려줌
+PCM_RATE = 24000
+PCM_SECONDS_PER_CHAR = 0.06
+
+
+def fake_pcm(text, speed=1.0):
+    """말하는 길이를 흉내 낸 440Hz 사인파 PCM 바이트."""
+    import numpy as np
+
+    samples = int(len(text) * PCM_SECONDS_PER_CHAR / speed * PCM_RATE)
+    tone = np.sin(2 * np.pi * 440 * np.arange(samples) / PCM_RATE) * 8000
+    return tone.astype("<i2").tobytes()
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 keep-alive 연결을 끊는 것은 정상 동작이므로 기록하지 않음
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class MockOpenAIServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, chunk_interval=0.02, chunk_count=40, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.chunk_interval = chunk_interval
+        self.chunk_count = chunk_count
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self._httpd = _QuietHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "errors": 0, "chat": 0, "speech": 0, "prompt_chars": []}
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "prompt_chars": list(self.stats["prompt_chars"])}
+
+    def _record(self, endpoint, prompt_chars=None, error=False):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[endpoint] += 1
+            if error:
+                self.stats["errors"] += 1
+            if prompt_chars is not None:
+                self.stats["prompt_chars"].append(prompt_chars)
+
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path.endswith("/chat/completions"):
+                    endpoint = "chat"
+                    prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+                elif self.path.endswith("/audio/speech"):
+                    endpoint = "speech"
+                    prompt_chars = len(body.get("input", ""))
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                time.sleep(server.latency)
+                if server._should_fail():
+                    server._record(endpoint, prompt_chars, error=True)
+                    status = server._random.choice([429, 500])
+                    self._send_json(status, {"error": {"message": "injected error", "type": "mock"}}, {"retry-after-ms": "10"})
+                    return
+                server._record(endpoint, prompt_chars)
+
+                if endpoint == "speech" and body.get("response_format") == "pcm":
+                    self._send_bytes(200, fake_pcm(body.get("input", ""), body.get("speed") or 1.0), "audio/pcm")
+                elif endpoint == "speech":
+                    self._send_bytes(200, FAKE_AUDIO, "audio/mpeg")
+                elif body.get("stream"):
+                    self._stream_chat(body, prompt_chars)
+                else:
+                    words = self._reply_words()
+                    self._send_json(200, {
+                        "id": "chatcmpl-mock",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "mock"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+                        "usage": self._usage(prompt_chars, len(words)),
+                    })
+
+            def _reply_words(self):
+                return [REPLY_WORDS[i % len(REPLY_WORDS)] for i in range(server.chunk_count)]
+
+            def _usage(self, prompt_chars, completion_tokens):
+                prompt_tokens = prompt_chars // 2 + 1
+                return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+            def _stream_chat(self, body, prompt_chars):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                base = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model", "mock")}
+                words = self._reply_words()
+                for i, word in enumerate(words):
+                    self._write_event({**base, "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}]})
+                    time.sleep(server.chunk_interval)
+                self._write_event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    self._write_event({**base, "choices": [], "usage": self._usage(prompt_chars, len(words))})
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_event(self, payload):
+                self._write_chunk(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status, payload, headers=None):
+                self._send_bytes(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json", headers)
+
+            def _send_bytes(self, status, data, content_type, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2, help="첫 응답까지 지연(초)")
+    parser.add_argument("--chunk-interval", type=float, default=0.02, help="스트리밍 조각 사이 간격(초)")
+    parser.add_argument("--chunks", type=int, default=40, help="응답 조각(단어) 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/500 오류를 낼 확률")
+    args = parser.parse_args()
+    server = MockOpenAIServer(args.host, args.port, args.latency, args.chunk_interval, args.chunks, args.error_rate)
+    print(f"mock OpenAI server on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,23 @@
 import streamlit as st
-from openai import OpenAI
 
-# OpenAI API 키 설정
-client = OpenAI(api_key=st.secrets["OPENAI"]["OPENAI_API_KEY"])
+from utils.openai_client import get_client, stream_text
+from utils.response_cache import get_response_cache, make_key
+from utils.telemetry import show_admin_panel
+
+# 모든 페이지가 함께 쓰는 OpenAI 클라이언트
+client = get_client("설계안")
+
+# 같은 요청은 저장된 설계안을 바로 돌려줌
+response_cache = get_response_cache()
+
+SYSTEM_ROLE = """당신은 교수학습 설계에 능숙한 베테랑 교사입니다. 언급된 내용을 참고하여 해당 교과의 수업 설계안을 작성합니다. 수업 설계안을 작성할 때에는 도입, 전개, 마무리로 구분하여 작성하세요.
+"""
+MODEL = "gpt-4o"
 
 def request_chat_completion(
     prompt,
-    system_role="""당신은 교수학습 설계에 능숙한 베테랑 교사입니다. 언급된 내용을 참고하여 해당 교과의 수업 설계안을 작성합니다. 수업 설계안을 작성할 때에는 도입, 전개, 마무리로 구분하여 작성하세요.
-""",
-    model="gpt-4o",
+    system_role=SYSTEM_ROLE,
+    model=MODEL,
     stream=False
 ):
     messages = [
@@ -26,6 +35,7 @@ st.set_page_config(
     page_title="GPT API를 활용한 챗봇 - 성호중 박범진",
     page_icon="🎇"
 )
+show_admin_panel()
 
 st.title("GPT-4o를 활용한 설계안 만들어보기")
 st.subheader("AI를 활용하여 설계안을 만들어봅시다")
@@ -59,16 +69,26 @@ with st.form("form"):
     st.text("수업에 꼭 넣고 싶은 것을 작성해주세요")
     st.session_state.form_data["must_include"] = st.text_area("꼭 넣고 싶은 것들", st.session_state.form_data["must_include"])
       
+    regenerate = st.checkbox("새로 생성하기 (저장된 설계안을 쓰지 않음)")
     submit = st.form_submit_button("Submit")
 
     if submit:
-        with st.spinner("설계안을 생성 중입니다!"):
-            prompt = f"수업시간은 45분이야. 과목: {st.session_state.form_data['subjects']}\n단원명: {st.session_state.form_data['units']}\n수업주제: {st.session_state.form_data['topics']}\n수업 상세 설명: {st.session_state.form_data['details']}\n꼭 넣고 싶은 것들: {st.session_state.form_data['must_include']}"
-            response = request_chat_completion(
-                prompt=prompt,
-                stream=False
-            )
-            st.session_state.form_data["response"] = response.choices[0].message.content
+        prompt = f"수업시간은 45분이야. 과목: {st.session_state.form_data['subjects']}\n단원명: {st.session_state.form_data['units']}\n수업주제: {st.session_state.form_data['topics']}\n수업 상세 설명: {st.session_state.form_data['details']}\n꼭 넣고 싶은 것들: {st.session_state.form_data['must_include']}"
+        cache_key = make_key(MODEL, SYSTEM_ROLE, prompt)
+        cached = None if regenerate else response_cache.get(cache_key)
+        if cached is not None:
+            st.session_state.form_data["response"] = cached
+        else:
+            # 생성되는 대로 보여주고, 완성된 설계안은 아래에서 다시 표시
+            preview = st.empty()
+            with preview:
+                response = request_chat_completion(
+                    prompt=prompt,
+                    stream=True
+                )
+                st.session_state.form_data["response"] = st.write_stream(stream_text(response))
+            preview.empty()
+            response_cache.set(cache_key, st.session_state.form_data["response"])
 
 if st.session_state.form_data["response"]:
     st.success("제출 완료!")
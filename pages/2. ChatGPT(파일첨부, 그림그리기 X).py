@@ -1,41 +1,149 @@
+import time
+
 import streamlit as st
-from openai import OpenAI
 
-# OpenAI API 키 설정
-client = OpenAI(api_key=st.secrets["OPENAI"]["OPENAI_API_KEY"])
+from utils.chat_history import (
+    DEFAULT_HISTORY_BUDGET,
+    message_tokens,
+    summary_message,
+    update_summary,
+    window_start,
+)
+from utils.conversation_store import get_conversation_store
+from utils.openai_client import get_client
+from utils.telemetry import show_admin_panel
+
+# 모든 페이지가 함께 쓰는 OpenAI 클라이언트
+client = get_client("채팅")
+# 대화 기록은 서버의 SQLite 파일에 저장 (새로고침하거나 나중에 와도 이어서 대화 가능)
+store = get_conversation_store()
+
+# 한 번에 화면에 그리는 최근 메시지 수. 더 오래된 메시지는 버튼을 눌러야 불러온다
+RENDER_WINDOW = 20
+# 이 브라우저에서 기억하는 대화 수 (주소에 담기므로 너무 많이 두지 않음)
+RECENT_CONVERSATIONS = 30
 
 st.title("임시용 챗봇 - 성호중 박범진")
+show_admin_panel()
 
 if "openai_model" not in st.session_state:
     st.session_state["openai_model"] = "gpt-4o"
 
 system_message = '''All messages are so important. Take step by step. If you want more information, get it before answer. 
 '''
+system = {"role": "system", "content": system_message}
+
+
+# 이 브라우저에서 만들거나 연 대화만 목록에 보이도록 ID 를 주소의 ?history=... 에 담아 둔다
+# (대화 ID 는 추측할 수 없는 임의 값이므로 ID 를 아는 브라우저만 그 대화를 열 수 있음)
+def remember_conversation(conversation_id):
+    owned = [owned_id for owned_id in st.session_state["owned_conversations"] if owned_id != conversation_id]
+    st.session_state["owned_conversations"] = [conversation_id] + owned[:RECENT_CONVERSATIONS - 1]
+    st.query_params["history"] = st.session_state["owned_conversations"]
+
+# 저장된 대화를 열거나(conversation_id 가 None 이면) 새 대화를 준비
+def open_conversation(conversation_id):
+    conversation = store.get(conversation_id) if conversation_id else None
+    st.session_state["conversation_id"] = conversation.id if conversation else None
+    # 예산 밖으로 밀려난 예전 대화의 요약과, 요약에 반영된 메시지 수 (시스템 메시지 제외)
+    st.session_state["history_summary"] = conversation.summary if conversation else ""
+    st.session_state["summarized_count"] = conversation.summarized_count if conversation else 0
+    st.session_state["shown_count"] = RENDER_WINDOW
+    if conversation:
+        st.query_params["conversation"] = conversation.id
+        remember_conversation(conversation.id)
+    elif "conversation" in st.query_params:
+        del st.query_params["conversation"]
+
+def show_more():
+    st.session_state["shown_count"] += RENDER_WINDOW
 
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+def conversation_label(conversation):
+    if conversation is None:
+        return "새 대화"
+    return f"{conversation.title} ({time.strftime('%m/%d %H:%M', time.localtime(conversation.updated_at))})"
 
-if len(st.session_state.messages) == 0:
-    st.session_state.messages = [{"role": "system", "content": system_message}]
 
-for idx, message in enumerate(st.session_state.messages):
-    if idx > 0:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+# 주소의 ?history=... 와 ?conversation=... 으로 새로고침 전의 대화 목록과 열려 있던 대화를 되살린다
+if "owned_conversations" not in st.session_state:
+    st.session_state["owned_conversations"] = st.query_params.get_all("history")[:RECENT_CONVERSATIONS]
+if "conversation_id" not in st.session_state:
+    open_conversation(st.query_params.get("conversation"))
+
+history_budget = st.sidebar.number_input(
+    "대화 기록 토큰 한도",
+    min_value=500,
+    value=DEFAULT_HISTORY_BUDGET,
+    step=500,
+    help="요청마다 보내는 대화 기록의 최대 토큰 수입니다. 넘치는 예전 대화는 요약되어 전달됩니다."
+)
+
+conversations = {conversation.id: conversation for conversation in store.get_many(st.session_state["owned_conversations"])}
+conversation_id = st.session_state["conversation_id"]
+options = [None] + list(conversations)
+choice = st.sidebar.selectbox(
+    "대화 불러오기",
+    options,
+    index=options.index(conversation_id),
+    format_func=lambda option: conversation_label(conversations.get(option)),
+)
+if choice != conversation_id:
+    open_conversation(choice)
+    conversation_id = choice
+
+# 최근 메시지만 그려서 대화가 길어져도 다시 실행하는 시간이 일정하게 유지되도록
+count = store.count(conversation_id) if conversation_id else 0
+shown_start = max(0, count - st.session_state["shown_count"])
+if shown_start > 0:
+    st.button(f"이전 메시지 {min(shown_start, RENDER_WINDOW)}개 더 보기", on_click=show_more)
+for message in store.messages(conversation_id, shown_start, count) if conversation_id else []:
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
 
 if prompt := st.chat_input("안녕하세요?"):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    created = conversation_id is None
+    if created:
+        conversation_id = store.create(prompt)
+        st.session_state["conversation_id"] = conversation_id
+        st.query_params["conversation"] = conversation_id
+        remember_conversation(conversation_id)
+    store.append(conversation_id, "user", prompt)
     with st.chat_message("user"):
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
+        # 아직 요약되지 않은 부분만 읽는다 (요약이 예산을 지키므로 길이가 제한됨)
+        history = store.messages(conversation_id, st.session_state["summarized_count"])
+        budget = history_budget - message_tokens(system)
+        if st.session_state["history_summary"]:
+            budget -= message_tokens(summary_message(st.session_state["history_summary"]))
+        start = window_start(history, budget)
+
+        # 새로 밀려난 메시지만 기존 요약에 덧붙여 갱신
+        if start > 0:
+            st.session_state["history_summary"] = update_summary(
+                client,
+                st.session_state["history_summary"],
+                history[:start],
+            )
+            st.session_state["summarized_count"] += start
+            store.set_summary(conversation_id, st.session_state["history_summary"], st.session_state["summarized_count"])
+
+        request_messages = [system]
+        if st.session_state["history_summary"]:
+            request_messages.append(summary_message(st.session_state["history_summary"]))
+        request_messages += history[start:]
+
         stream = client.chat.completions.create(
             model=st.session_state["openai_model"],
             messages=[
                 {"role": m["role"], "content": m["content"]}
-                for m in st.session_state.messages
+                for m in request_messages
             ],
             stream=True,
         )
         response = st.write_stream(stream)
-    st.session_state.messages.append({"role": "assistant", "content": response})
+    store.append(conversation_id, "assistant", response)
+    # 사이드바 목록에 새 대화가 보이도록 한 번 더 그림
+    if created:
+        st.rerun()
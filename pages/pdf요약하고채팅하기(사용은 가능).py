@@ -1,21 +1,64 @@
 import streamlit as st
-import pdfplumber
-import io
-from openai import OpenAI
 
-# OpenAI 클라이언트 생성 및 API 키 설정
-client = OpenAI(api_key=st.secrets["OPENAI"]["OPENAI_API_KEY"])
+from utils.openai_client import get_client, stream_text
+from utils.document_store import get_document_store
+from utils.pdf_text import count_pages, iter_page_texts
+from utils.response_cache import get_response_cache
+from utils.retrieval import TOP_K
+from utils.storage import content_hash
+from utils.summarize import LENGTHS, summarize_document
+from utils.telemetry import show_admin_panel
+
+# 모든 페이지가 함께 쓰는 OpenAI 클라이언트
+client = get_client("PDF 채팅")
 
 # Streamlit 앱 제목 및 안내 문구
 st.title("PDF로 GPT와 대화 - 성호중 박범진")
+show_admin_panel()
 st.markdown("<p style='font-size:20px;'>PDF 를 업로드하고 질문을 작성한 뒤 엔터를 눌러주세요.</p>", unsafe_allow_html=True)
 st.markdown("<p style='font-size:20px;'>오른쪽 위 'Running'이 끝나면 답변이 출력됩니다.</p>", unsafe_allow_html=True)
 st.markdown("<p style='font-size:20px;'>채팅시 밑에 새로 생기는 채팅 상자는 무시해주세요 왜 생기는지 모르겠네요 ㅠㅠ</p>", unsafe_allow_html=True)
 
+# 추출한 텍스트와 검색 색인은 모든 세션이 내용 해시별로 한 벌만 공유하고, 세션은 핸들만 가짐
+document_store = get_document_store()
+# 부분 요약은 청크 내용별로 디스크에 저장해 두고 다시 씀
+response_cache = get_response_cache()
+
+# 쪽수는 쪽 범위 선택에 필요하므로 문서마다 한 번만 셈
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_page_count(file_hash, _data):
+    return count_pages(_data)
+
+# 추출 진행 상황. polling 이면 1초마다 이 부분만 다시 그림
+def extraction_progress(polling):
+    document = st.session_state['document']
+    if document is None:
+        return
+    done, total = document.progress
+    if document.error is not None:
+        st.error(f"PDF에서 텍스트를 추출하는 중 오류가 발생했습니다: {document.error}")
+    elif not document.complete:
+        st.progress(done / max(total, 1), text=f"PDF에서 텍스트를 추출하는 중입니다... ({done}/{total}쪽) 추출된 쪽부터 바로 질문할 수 있습니다.")
+        return
+    else:
+        st.write("PDF에서 추출된 내용이 지식 베이스로 저장되었습니다.")
+    # 추출이 끝나면 앱 전체를 한 번 다시 실행해 폴링을 멈추고 요약 버튼 등을 갱신
+    if polling:
+        st.rerun()
+
+def show_extraction_progress():
+    document = st.session_state['document']
+    # 추출이 끝난 뒤에는 폴링하지 않음
+    polling = document is not None and not document.complete and document.error is None
+    st.fragment(extraction_progress, run_every=1.0 if polling else None)(polling)
+
+# 요청에 함께 보낼 최근 대화 메시지 수
+RECENT_MESSAGES = 6
+
 
 # 세션 상태 초기화
-if 'knowledge_base' not in st.session_state:
-    st.session_state['knowledge_base'] = ""
+if 'document' not in st.session_state:
+    st.session_state['document'] = None
 
 if 'messages' not in st.session_state:
     st.session_state['messages'] = []
@@ -23,36 +66,63 @@ if 'messages' not in st.session_state:
 # PDF 파일 업로드
 uploaded_file = st.file_uploader("PDF 파일을 업로드하세요", type=['pdf'])
 if uploaded_file is not None:
-    with pdfplumber.open(io.BytesIO(uploaded_file.getvalue())) as pdf:
-        text = ''
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n\n"
-
-        st.session_state['knowledge_base'] = text
-        st.write("PDF에서 추출된 내용이 지식 베이스로 저장되었습니다.")
+    data = uploaded_file.getvalue()
+    file_hash = content_hash(data)
+    num_pages = load_page_count(file_hash, data)
+    first_page, last_page = 1, num_pages
+    if num_pages > 1 and st.checkbox("일부 쪽만 사용하기"):
+        first_page, last_page = st.slider("사용할 쪽 범위", 1, num_pages, (1, num_pages))
+    # 쪽 범위가 다르면 다른 문서로 취급
+    document_key = file_hash if (first_page, last_page) == (1, num_pages) else f"{file_hash}:{first_page}-{last_page}"
+    document = st.session_state['document']
+    if document is None or document.key != document_key:
+        # 다른 문서로 바꾸면 이전 문서의 참조를 먼저 돌려줌
+        if document is not None:
+            document.release()
+        # 텍스트는 백그라운드에서 한 쪽씩 추출되므로 바로 다음 단계로 넘어감
+        st.session_state['document'] = document_store.acquire(
+            document_key,
+            lambda: iter_page_texts(data, first_page - 1, last_page),
+            total_pages=last_page - first_page + 1,
+        )
+    show_extraction_progress()
 
 # 대화 초기화 버튼
 if st.button('대화 초기화'):
     st.session_state['messages'] = []
     st.write("대화가 초기화되었습니다.")
 
+# 질문을 입력했을 때 한 번만 답하도록 콜백에서 꺼내 두고 입력란은 비움
+# (요약 설정이나 쪽 범위를 바꿔 다시 실행될 때 같은 질문을 또 보내지 않게)
+def submit_query():
+    st.session_state['pending_query'] = st.session_state['user_query'].strip()
+    st.session_state['user_query'] = ''
+
 # 사용자 질문 입력
-user_query = st.text_input("질문을 입력하세요:")
+st.text_input("질문을 입력하세요:", key="user_query", on_change=submit_query, help="질문을 입력하고 엔터를 누르세요.")
+user_query = st.session_state.pop('pending_query', None)
 
 # 사용자 질문 처리
 if user_query:
     # 지식 베이스가 존재하는지 확인
-    if st.session_state['knowledge_base']:
-        # 메시지 초기화 및 시스템 프롬프트 추가
-        if not st.session_state['messages']:
-            st.session_state['messages'].append(
-                {"role": "system", "content": f"다음 문서 내용을 바탕으로 질문에 답해주세요:\n{st.session_state['knowledge_base']}"}
-            )
+    document = st.session_state['document']
+    if document is not None and document.progress[0] == 0:
+        st.warning("아직 추출된 쪽이 없습니다. 잠시 후 다시 질문해 주세요.")
+    elif document is not None:
         # 사용자 메시지 추가
         st.session_state['messages'].append({"role": "user", "content": user_query})
 
+        # 문서 전체 대신 질문과 관련된 부분만 시스템 프롬프트에 넣고, 최근 대화만 함께 보냄
+        with st.spinner("문서 검색 색인을 만드는 중입니다..."):
+            index = document.index
+        if not document.complete:
+            done, total = document.progress
+            st.caption(f"지금까지 추출된 {done}/{total}쪽을 바탕으로 답합니다.")
+        passages = "\n\n---\n\n".join(index.search(user_query, k=TOP_K))
+        request_messages = [
+            {"role": "system", "content": f"다음 문서 내용을 바탕으로 질문에 답해주세요:\n{passages}"}
+        ] + st.session_state['messages'][-RECENT_MESSAGES:]
+
         # 이전 대화 내용 표시
         for message in st.session_state['messages']:
             if message['role'] == 'user':
@@ -60,27 +130,26 @@ if user_query:
             elif message['role'] == 'assistant':
                 st.write(f"**GPT의 답변:** {message['content']}")
 
-        # GPT 응답 생성 중 스피너 표시
-        with st.spinner('GPT가 응답을 생성 중입니다...'):
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-4o",  # 또는 "gpt-4"를 사용하려면 해당 권한 필요
-                    messages=st.session_state['messages'],
-                    temperature=0.7,
-                )
-                # response에서 content를 가져올 때 객체로 접근
-                answer = response.choices[0].message.content
-
-                # 어시스턴트 응답 추가
-                st.session_state['messages'].append({"role": "assistant", "content": answer})
+        # GPT 응답을 생성되는 대로 표시
+        try:
+            stream = client.chat.completions.create(
+                model="gpt-4o",  # 또는 "gpt-4"를 사용하려면 해당 권한 필요
+                messages=request_messages,
+                temperature=0.7,
+                stream=True,
+            )
+            answer_slot = st.empty()
+            answer_slot.write("**GPT의 답변:** ...")
+            answer = ''
+            for delta in stream_text(stream):
+                answer += delta
+                answer_slot.write(f"**GPT의 답변:** {answer}")
 
-                # 어시스턴트 응답 표시
-                st.write(f"**GPT의 답변:** {answer}")
+            # 어시스턴트 응답 추가
+            st.session_state['messages'].append({"role": "assistant", "content": answer})
 
-                # 질문 입력 필드 초기화: 여기서 session_state를 수정하는 대신 빈 값으로 초기화
-                st.text_input("질문을 입력하세요:", value='', key="user_query", help="새로운 질문을 입력하세요.")
-            except Exception as e:
-                st.error(f"에러가 발생했습니다: {e}")
+        except Exception as e:
+            st.error(f"에러가 발생했습니다: {e}")
 
         # 메시지 구분선 추가
         st.markdown("---")
@@ -94,3 +163,31 @@ else:
                 st.write(f"**사용자:** {message['content']}")
             elif message['role'] == 'assistant':
                 st.write(f"**GPT의 답변:** {message['content']}")
+
+# 문서 요약: 청크별로 동시에 요약한 뒤 부분 요약들을 단계적으로 합침
+if st.session_state['document'] is not None:
+    document = st.session_state['document']
+    with st.expander("📝 문서 요약하기"):
+        summary_length = st.radio("요약 길이", list(LENGTHS), index=1, horizontal=True)
+        summary_focus = st.text_input("요약 초점 (선택)", help="예: 실험 방법, 평가 기준. 비워 두면 문서 전체를 고르게 요약합니다.")
+        if not document.complete:
+            st.caption("텍스트 추출이 끝나면 요약할 수 있습니다.")
+        if st.button("요약하기", disabled=not document.complete):
+            stage_names = {"map": "부분별로 요약하는 중", "reduce": "부분 요약을 합치는 중", "final": "전체 요약을 정리하는 중"}
+            progress = st.progress(0.0, text="요약을 준비하는 중입니다...")
+            try:
+                summary = summarize_document(
+                    client,
+                    document.text,
+                    length=summary_length,
+                    focus=summary_focus.strip(),
+                    cache=response_cache,
+                    on_progress=lambda stage, done, total: progress.progress(done / total, text=f"{stage_names[stage]}입니다... ({done}/{total})"),
+                )
+                st.session_state['summary'] = (document.key, summary)
+            except Exception as e:
+                st.error(f"요약하는 중 에러가 발생했습니다: {e} (끝난 부분은 저장되어 있어 다시 누르면 이어서 진행합니다)")
+            progress.empty()
+        summary = st.session_state.get('summary')
+        if summary and summary[0] == document.key:
+            st.markdown(summary[1])
@@ -1,82 +1,198 @@
+import pandas as pd
 import streamlit as st
-from openai import OpenAI
 
-# OpenAI API 키 설정
-client = OpenAI(api_key=st.secrets["OPENAI"]["OPENAI_API_KEY"])
+from utils.concurrency import DEFAULT_MAX_WORKERS
+from utils.job_queue import DONE, ERROR, get_job_runner
+from utils.openai_client import get_client
+from utils.roster import apply_editor_changes, empty_roster, read_roster
+from utils.storage import content_hash
+from utils.telemetry import show_admin_panel
+
+# 모든 페이지가 함께 쓰는 OpenAI 클라이언트 (속도 제한 시 재시도 포함)
+client = get_client("모범상")
 
 # 모델 이름 설정
 MODEL = "gpt-4o"
+# 작업 대기열에서 이 페이지의 작업을 구분하는 이름
+JOB_KIND = "award_recommendation"
+# 명렬표 편집기와 추천 이유를 한 번에 보여 줄 학생 수
+PAGE_SIZE = 50
+
+# 추천서 생성은 서버의 백그라운드 작업으로 돌고 결과는 SQLite 에 저장됨
+job_runner = get_job_runner()
+
+# 세션 상태 초기화: 명렬표는 학생 한 명이 한 행인 DataFrame 하나로 관리
+if 'roster' not in st.session_state:
+    st.session_state['roster'] = empty_roster()
+if 'roster_version' not in st.session_state:
+    st.session_state['roster_version'] = 0
+if 'roster_page' not in st.session_state:
+    st.session_state['roster_page'] = 1
+if 'job' not in st.session_state:
+    st.session_state['job'] = None
 
-# 세션 상태 초기화
-if 'student_entries' not in st.session_state:
-    st.session_state['student_entries'] = []
-if 'recommendations' not in st.session_state:
-    st.session_state['recommendations'] = []
+# 명렬표가 편집기 밖에서 바뀌면 편집기를 새로 그리도록 키를 바꿈 (이전 편집 기록이 다시 적용되지 않게)
+def refresh_editor():
+    st.session_state['roster_version'] += 1
 
-# 학생 항목 추가 함수
+def page_count(rows):
+    return max(1, -(-rows // PAGE_SIZE))
+
+# 학생 항목 추가 함수 (빈 행을 추가하고 마지막 쪽으로 이동)
 def add_student_entry():
-    st.session_state['student_entries'].append({'student_name': '', 'award_name': '', 'student_quality': ''})
+    st.session_state['roster'] = pd.concat([st.session_state['roster'], empty_roster(1)], ignore_index=True)
+    st.session_state['roster_page'] = page_count(len(st.session_state['roster']))
+    refresh_editor()
 
 # 세션 상태 초기화 함수
 def reset_entries():
-    st.session_state['student_entries'] = []
-    st.session_state['recommendations'] = []
+    st.session_state['roster'] = empty_roster()
+    st.session_state['roster_page'] = 1
+    st.session_state['job'] = None
+    refresh_editor()
+
+# 편집기에서 고친 내용을 명렬표에 반영
+def save_roster_edits(start, stop, editor_key):
+    st.session_state['roster'] = apply_editor_changes(st.session_state['roster'], start, stop, st.session_state[editor_key])
+    refresh_editor()
+
+# 추천서 한 건 생성 함수 (백그라운드 작업 스레드에서 실행되므로 st.* 를 사용하지 않음)
+def generate_recommendation(payload):
+    prompt = (
+        f"'{payload['award_name']}' 상을 받을 학생인 {payload['student_name']}의 우수한 점은 다음과 같습니다: {payload['student_quality']}. "
+        f"이러한 점을 바탕으로 해당 중학생의 추천서를 작성해 주세요. 300~400자 내외로 작성하시오."
+    )
+    response = client.chat.completions.create(
+        model=payload['model'],
+        messages=[
+            {"role": "system", "content": "당신은 도움이 되는 조수입니다."},
+            {"role": "user", "content": prompt}
+        ],
+    )
+    return response.choices[0].message.content.strip()
+
+# 추천 이유 한 건 표시 함수
+def render_recommendation(slot, rec):
+    with slot.container():
+        st.write(f"**{rec['student_name']}** 학생의 '{rec['award_name']}' 상 추천 이유:")
+        st.write(f"{rec['recommendation']}")
+        st.write("---")
 
 # UI 레이아웃
 st.title('학생 추천 상장 생성기')
+show_admin_panel()
 st.write('학생의 우수한 점을 기록하고 GPT-4o 모델을 활용해 추천 이유를 자동 생성하세요.')
 
-# 각 학생 항목에 대한 입력 필드 생성 (한 행에 세 열로 배치)
-for idx, entry in enumerate(st.session_state['student_entries']):
-    cols = st.columns(3)
-    with cols[0]:
-        entry['student_name'] = st.text_input(f"학생 이름 (학생 {idx + 1})", value=entry['student_name'], key=f"student_name_{idx}")
-    with cols[1]:
-        entry['award_name'] = st.text_input(f"상의 이름 (학생 {idx + 1})", value=entry['award_name'], key=f"award_name_{idx}")
-    with cols[2]:
-        entry['student_quality'] = st.text_input(f"학생의 우수한 점 (학생 {idx + 1})", value=entry['student_quality'], key=f"student_quality_{idx}")
+# 동시 생성 수 설정
+max_workers = st.sidebar.slider('동시 생성 수', 1, 16, DEFAULT_MAX_WORKERS, help="한 번에 요청할 추천서 개수입니다. 속도 제한 오류가 잦으면 줄여주세요.")
 
-# 학생 추가 버튼
-if st.button('+ 학생 추가'):
-    add_student_entry()
-
-# 생성 버튼
-if st.button('생성'):
-    recommendations = []
-    for entry in st.session_state['student_entries']:
-        prompt = (
-            f"'{entry['award_name']}' 상을 받을 학생인 {entry['student_name']}의 우수한 점은 다음과 같습니다: {entry['student_quality']}. "
-            f"이러한 점을 바탕으로 해당 중학생의 추천서를 작성해 주세요. 300~400자 내외로 작성하시오."
-        )
+# 서버가 다시 시작되어 멈춘 작업이 있으면 이어서 처리 (서버 프로세스마다 처음 한 번만 확인)
+job_runner.resume(JOB_KIND, generate_recommendation, max_workers)
 
+# 명렬표 불러오기
+roster_file = st.file_uploader(
+    "명렬표 불러오기 (CSV/Excel)",
+    type=['csv', 'xlsx'],
+    help="'학생 이름', '상의 이름', '우수한 점' 열이 있는 파일을 올리면 학생 목록을 한 번에 채웁니다. 머리글이 다르면 앞에서부터 순서대로 씁니다."
+)
+if roster_file is not None:
+    roster_data = roster_file.getvalue()
+    roster_hash = content_hash(roster_data)
+    if st.session_state.get('roster_hash') != roster_hash:
         try:
-            response = client.chat.completions.create(
-                model=MODEL,
-                messages=[
-                    {"role": "system", "content": "당신은 도움이 되는 조수입니다."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            recommendation = response.choices[0].message.content.strip()
+            roster = read_roster(roster_data, roster_file.name)
         except Exception as e:
-            recommendation = f"오류 발생: {str(e)}"
+            st.error(f"명렬표를 읽는 중 오류가 발생했습니다: {e}")
+        else:
+            st.session_state['roster'] = roster
+            st.session_state['roster_hash'] = roster_hash
+            st.session_state['roster_page'] = 1
+            refresh_editor()
+            st.success(f"{len(roster)}명의 학생을 불러왔습니다.")
 
-        recommendations.append({
-            'student_name': entry['student_name'],
-            'award_name': entry['award_name'],
-            'recommendation': recommendation
-        })
+# 명렬표 편집기: 학생 수와 상관없이 한 쪽(PAGE_SIZE 명)만 그림
+roster = st.session_state['roster']
+num_pages = page_count(len(roster))
+if st.session_state['roster_page'] > num_pages:
+    st.session_state['roster_page'] = num_pages
+if num_pages > 1:
+    page = st.number_input(f"쪽 (전체 {num_pages}쪽, {len(roster)}명)", min_value=1, max_value=num_pages, key='roster_page')
+else:
+    page = 1
+start, stop = (page - 1) * PAGE_SIZE, min(page * PAGE_SIZE, len(roster))
+page_rows = roster.iloc[start:stop].copy()
+# 행 번호는 명렬표 전체에서의 번호(1부터)로 표시
+page_rows.index = range(start + 1, stop + 1)
+editor_key = f"roster_editor_{st.session_state['roster_version']}_{page}"
+st.data_editor(
+    page_rows,
+    key=editor_key,
+    num_rows="dynamic",
+    width="stretch",
+    column_config={
+        "student_name": st.column_config.TextColumn("학생 이름"),
+        "award_name": st.column_config.TextColumn("상의 이름"),
+        "student_quality": st.column_config.TextColumn("학생의 우수한 점", width="large"),
+    },
+    on_change=save_roster_edits,
+    args=(start, stop, editor_key),
+)
 
-    st.session_state['recommendations'] = recommendations
+# 학생 추가 버튼
+st.button('+ 학생 추가', on_click=add_student_entry)
 
-# 추천 이유 표시
-if st.session_state['recommendations']:
+# 생성 버튼: 같은 학생 목록이면 같은 작업이 되므로, 이미 만든 추천서는 다시 요청하지 않고 실패한 것만 다시 만듦
+if st.button('생성', help="창을 닫거나 새로고침해도 서버에서 계속 만듭니다. 같은 명렬표로 다시 누르면 이어서 볼 수 있습니다."):
+    roster = st.session_state['roster']
+    # 이름이 빈 행은 건너뛰고, 결과를 명렬표 행과 맞출 수 있도록 행 번호를 함께 저장
+    rows = [int(row) for row in roster.index[roster['student_name'].str.strip() != '']]
+    entries = roster.iloc[rows].to_dict('records')
+    job_id = job_runner.queue.submit(JOB_KIND, [dict(entry, model=MODEL) for entry in entries])
+    job_runner.start(job_id, generate_recommendation, max_workers)
+    st.session_state['job'] = (job_id, entries, rows)
+
+# 추천 이유 표시: polling 이면 작업이 끝날 때까지 2초마다 진행 상황과 결과를 다시 읽어 옴
+# 결과는 명렬표 행 번호로 맞춰, 편집기에 보이는 쪽의 학생들만 그림
+def recommendations_view(start, stop, polling):
+    job_id, entries, rows = st.session_state['job']
+    results = job_runner.queue.results(job_id)
+    finished = sum(status in (DONE, ERROR) for status, _, _ in results)
+    if finished < len(results):
+        st.progress(finished / len(results), text=f"추천서를 만드는 중입니다... ({finished}/{len(results)})")
+    elif polling:
+        # 다 끝났으면 앱 전체를 한 번 다시 실행해 폴링을 멈춤
+        st.rerun()
+    recommendations = []
+    for status, result, error in results:
+        if status == DONE:
+            recommendations.append(result)
+        elif status == ERROR:
+            recommendations.append(f"오류 발생: {error}")
+        else:
+            recommendations.append('생성 중...')
     st.subheader('추천 이유')
-    for rec in st.session_state['recommendations']:
-        st.write(f"**{rec['student_name']}** 학생의 '{rec['award_name']}' 상 추천 이유:")
-        st.write(f"{rec['recommendation']}")
-        st.write("---")
+    for row, entry, recommendation in zip(rows, entries, recommendations):
+        if start <= row < stop:
+            render_recommendation(st.empty(), {'student_name': entry['student_name'], 'award_name': entry['award_name'], 'recommendation': recommendation})
+    # 전체 내려받기는 작업이 끝난 뒤에만 만듦 (폴링할 때마다 CSV 를 다시 만들지 않도록)
+    if finished < len(results):
+        return
+    table = pd.DataFrame(entries).assign(recommendation=recommendations)
+    table.index = [row + 1 for row in rows]
+    st.download_button(
+        "추천 이유 전체 내려받기 (CSV)",
+        table.rename(columns={'student_name': '학생 이름', 'award_name': '상의 이름', 'student_quality': '우수한 점', 'recommendation': '추천 이유'}).to_csv(index_label='번호').encode('utf-8-sig'),
+        file_name="recommendations.csv",
+        mime="text/csv",
+    )
+
+def show_recommendations(start, stop):
+    if st.session_state['job'] is None:
+        return
+    polling = not job_runner.is_finished(st.session_state['job'][0])
+    st.fragment(recommendations_view, run_every=2.0 if polling else None)(start, stop, polling)
+
+show_recommendations(start, stop)
 
 # 초기화 버튼
-if st.button('초기화'):
-    reset_entries()
+st.button('초기화', on_click=reset_entries)
@@ -1,11 +1,18 @@
 import streamlit as st
 from pathlib import Path
-from openai import OpenAI
-from collections import Counter
-import re
 import random
-from pydub import AudioSegment
-from io import BytesIO
+
+from utils.audio import MIME_TYPES, assemble_pcm, encode, output_format
+from utils.concurrency import fan_out
+from utils.openai_client import get_client
+from utils.response_cache import get_clip_cache, make_key
+from utils.script_parser import iter_utterances, parse_script
+from utils.telemetry import show_admin_panel
+
+TTS_MODEL = "tts-1"
+TTS_WORKERS = 8
+# 같은 문장·음성·속도로 만든 음성은 디스크에 저장해 두고 다시 씀
+clip_cache = get_clip_cache()
 
 # CSS 스타일 추가
 st.markdown(
@@ -25,40 +32,6 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-def is_input_exist(text):
-    pattern = re.compile(r'[a-zA-Z가-힣]')
-    return not bool(pattern.search(text))
-
-def which_eng_kor(input_s):
-    count = Counter(input_s)
-    k_count = sum(count[c] for c in count if ord('가') <= ord(c) <= ord('힣'))
-    e_count = sum(count[c] for c in count if 'a' <= c.lower() <= 'z')
-    return "ko" if k_count > e_count else "en"
-
-def extract_question(text):
-    match = re.match(r'(\d{1,2}\s*\.?\s*번?)\s*(.*)', text)
-    if match:
-        number = match.group(1).strip()
-        question = match.group(2).strip()
-        return number, question
-    else:
-        return None, text.lstrip()
-
-def merge_lines(lines):
-    merged = []
-    current_sentence = ""
-    for line in lines:
-        line = line.strip()
-        if line.endswith('.') or line.endswith('?') or line.endswith('!'):
-            current_sentence += " " + line
-            merged.append(current_sentence.strip())
-            current_sentence = ""
-        else:
-            current_sentence += " " + line
-    if current_sentence:
-        merged.append(current_sentence.strip())
-    return merged
-
 def get_voice(option, idx, gender):
     if option in ["random", "sequential"]:
         if gender == "female":
@@ -77,15 +50,58 @@ def get_voice(option, idx, gender):
         print(f"Selected {gender} voice: {option}")
         return option
 
+def assign_voices(utterances, ko_option, female_voice, male_voice):
+    """발화마다 음성을 정한다. random/sequential 은 문제마다 성별별로 한 번만 고른다."""
+    chosen = {}
+    voices = []
+    for utterance in utterances:
+        if utterance.language == "ko":
+            voices.append(ko_option)
+            continue
+        key = (utterance.question, utterance.gender)
+        if key not in chosen:
+            option = female_voice if utterance.gender == "female" else male_voice
+            chosen[key] = get_voice(option, utterance.question, utterance.gender)
+        voices.append(chosen[key])
+    return voices
+
+def synthesize(text, voice, speed):
+    """문장 하나의 음성 PCM 과 캐시 적중 여부를 돌려준다."""
+    key = make_key(TTS_MODEL, "pcm", voice, round(speed, 2), text)
+    clip = clip_cache.get(key)
+    if clip is not None:
+        return clip, True
+    response = client.audio.speech.create(
+        model=TTS_MODEL,
+        voice=voice,
+        input=text,
+        speed=speed,
+        # 디코딩 없이 바로 이어 붙일 수 있도록 압축하지 않은 PCM 으로 받음
+        response_format="pcm",
+    )
+    clip_cache.set(key, response.content)
+    return response.content, False
+
+def assemble(utterances, clips, interline_ms, internum_s, fmt):
+    gaps_ms = [0]
+    for previous, utterance in zip(utterances, utterances[1:]):
+        # 대본에 쉼 표시가 있으면 그 길이를, 없으면 대사/문제 간격을 씀
+        if previous.pause_ms is not None:
+            gaps_ms.append(previous.pause_ms)
+        else:
+            gaps_ms.append(interline_ms if previous.question == utterance.question else internum_s * 1000)
+    return encode(assemble_pcm(clips, gaps_ms), fmt)
+
 # 여기에서 수정된 부분입니다.
 api_key = st.secrets["OPENAI"]["OPENAI_API_KEY"]
 
 if not api_key:
     st.error("API key not found. Please set the OPENAI_API_KEY in your secrets.")
 else:
-    client = OpenAI(api_key=api_key)
+    client = get_client("듣기평가")
 
 st.title("듣기평가 음원 만들기")
+show_admin_panel()
 st.markdown('제작 : 교사 박범진, <br>참고 소스코드 : 박현수 선생님', unsafe_allow_html=True)
 
 col_speed, col_subheader = st.columns([5, 7])
@@ -116,12 +132,53 @@ st.markdown("## 유의사항")
 st.markdown("""
 - **문제 번호 인식:** 문제의 시작에 '1번', '2번' 또는 '1.', '2.'을 작성
 - **음성 성별 변경:** 행의 처음에 음성지표(M:남성, W:여성)가 바뀌면 음성 성별이 바뀝니다.
+- **쉼 넣기:** 한 행에 '[쉼 3초]' 또는 '(pause 500ms)'처럼 쓰면 앞 문장 뒤에 그만큼 쉽니다.
 - **Random 선택:** 'random' 옵션은 문제마다 해당 성별의 음성을 무작위로 선택합니다.
 - **Sequential 선택:** 'sequential' 옵션은 문제마다 음성을 순서대로 바꿔 줍니다.
 """)
 
-st.text_area("대본 입력란", height=300, help="듣기평가 대본을 입력하세요.")
+script = st.text_area("대본 입력란", height=300, help="듣기평가 대본을 입력하세요.")
 
 if st.button("🔊 음원 생성하기"):
-    st.balloons()
-    st.success("음원이 생성되었습니다.")
+    parsed = parse_script(script)
+    for error in parsed.errors:
+        st.warning(f"{error.line_no}행: {error.message}")
+    utterances = list(iter_utterances(parsed))
+    voices = assign_voices(utterances, ko_option, female_voice, male_voice)
+    if not api_key:
+        st.error("API key not found. Please set the OPENAI_API_KEY in your secrets.")
+    elif not utterances:
+        st.warning("대본을 입력해주세요.")
+    else:
+        # 문장별 음성 합성을 동시에 요청하고, 결과는 대본 순서대로 모음
+        clips = [None] * len(utterances)
+        failed = []
+        reused = 0
+        progress = st.progress(0.0, text="음성을 합성하는 중입니다...")
+        for done, (idx, result, error) in enumerate(fan_out(lambda item: synthesize(item[0].text, item[1], speed_rate), list(zip(utterances, voices)), max_workers=TTS_WORKERS), start=1):
+            if error is not None:
+                failed.append((idx, error))
+            else:
+                clips[idx], cached = result
+                reused += cached
+            progress.progress(done / len(utterances), text=f"음성을 합성하는 중입니다... ({done}/{len(utterances)})")
+        progress.empty()
+
+        if failed:
+            for idx, error in sorted(failed):
+                st.error(f"{idx + 1}번째 문장 합성 중 오류가 발생했습니다: {utterances[idx].text} ({error})")
+        else:
+            with st.spinner("음원을 합치는 중입니다..."):
+                audio_format = output_format()
+                st.session_state["listening_audio"] = (assemble(utterances, clips, interline, internum, audio_format), audio_format)
+            st.balloons()
+            st.success("음원이 생성되었습니다.")
+            if reused:
+                st.caption(f"{len(utterances)}개 문장 중 {reused}개는 저장된 음성을 다시 썼습니다.")
+
+if st.session_state.get("listening_audio"):
+    audio, audio_format = st.session_state["listening_audio"]
+    if audio_format != "mp3":
+        st.info("서버에 ffmpeg 가 없어 WAV 파일로 만들었습니다.")
+    st.audio(audio, format=MIME_TYPES[audio_format])
+    st.download_button("음원 다운로드", audio, file_name=f"listening.{audio_format}", mime=MIME_TYPES[audio_format])
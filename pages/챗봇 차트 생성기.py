@@ -1,10 +1,12 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from io import BytesIO
-import numpy as np
 import os
-import matplotlib.font_manager as fm
+
+from utils.batch_export import export_zip
+from utils.binning import bin_column, frequency_table
+from utils.chart_data import load_table
+from utils.charts import MIME_TYPES, register_font, render_chart
+from utils.stem_leaf import stem_and_leaf
+from utils.storage import content_hash
 
 # 페이지 설정은 반드시 최상단에서 실행
 st.set_page_config(
@@ -36,9 +38,7 @@ if not os.path.exists(font_path):
     st.stop()
 
 # 폰트 등록
-fm.fontManager.addfont(font_path)
-font_name = fm.FontProperties(fname=font_path).get_name()
-plt.rc('font', family=font_name)
+font_name = register_font(font_path)
 
 # Streamlit에 폰트 적용
 st.markdown(
@@ -56,6 +56,21 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# 업로드한 파일은 내용 해시별로 한 번만 읽어 둠 (숫자 열 목록도 함께 계산)
+@st.cache_data(max_entries=8, show_spinner="파일을 읽는 중입니다...")
+def load_data(file_hash, _data, name):
+    return load_table(file_hash, _data, name)
+
+# 도수는 (파일, 열, 시작 값, 간격) 마다 한 번만 세어 표와 모든 차트에서 함께 사용
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_binning(file_hash, column, bin_start, bin_width, _values):
+    return bin_column(_values, bin_start, bin_width)
+
+# 같은 설정의 차트는 한 번만 그려서 화면 표시와 다운로드에 함께 사용
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_chart_image(file_hash, column, chart_type, bin_start, bin_width, x_label, y_label, chart_title, color, line_color, line_style, fmt, _binning):
+    return render_chart(_binning, chart_type, x_label, y_label, chart_title, color, line_color, line_style, fmt=fmt)
+
 # 사용자 매뉴얼 섹션
 with st.expander("📖 사용자 매뉴얼"):
     st.markdown("""
@@ -85,15 +100,14 @@ uploaded_file = st.sidebar.file_uploader(
 if uploaded_file:
     try:
         # 파일 확장자에 따라 처리
-        if uploaded_file.name.endswith(".csv"):
-            data = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(".xlsx"):
-            data = pd.read_excel(uploaded_file, engine='openpyxl')
+        if uploaded_file.name.endswith((".csv", ".xlsx")):
+            file_bytes = uploaded_file.getvalue()
+            file_hash = content_hash(file_bytes)
+            data, numeric_columns = load_data(file_hash, file_bytes, uploaded_file.name)
+            st.sidebar.success("데이터가 성공적으로 업로드되었습니다.")
         else:
             st.error("지원하지 않는 파일 형식입니다. CSV 또는 Excel 파일을 업로드하세요.")
             data = None
-
-        st.sidebar.success("데이터가 성공적으로 업로드되었습니다.")
     except UnicodeDecodeError:
         st.sidebar.error("파일 인코딩 문제로 읽을 수 없습니다. 파일의 인코딩 방식을 확인하세요.")
         data = None
@@ -113,7 +127,6 @@ chart_type = st.sidebar.selectbox(
 
 # 컬럼 선택 및 추가 설정
 if data is not None:
-    numeric_columns = data.select_dtypes(include=[np.number]).columns.tolist()
     if not numeric_columns:
         st.error("숫자형 데이터가 포함된 컬럼이 없습니다.")
         column = None
@@ -134,6 +147,18 @@ if data is not None:
                 min_value=1,
                 help="줄기와 잎 그림에서 줄기의 자릿수를 설정합니다."
             )
+            leaf_unit = st.sidebar.number_input(
+                "잎의 단위 (예: 1, 0.1):",
+                value=stem_unit / 10,
+                min_value=0.0001,
+                format="%g",
+                help="잎 한 칸의 크기입니다. 소수 데이터는 0.1 처럼 작은 단위를 사용하세요."
+            )
+            stem_split = st.sidebar.selectbox(
+                "줄기 나누기:",
+                [1, 2, 5],
+                help="줄기 하나를 여러 줄로 나누어 표시합니다. (2: 잎 0~4 / 5~9)"
+            )
         else:
             # 계급 간격 및 시작 값 설정
             bin_width = st.sidebar.number_input(
@@ -179,6 +204,11 @@ if data is not None:
                     ["-", "--", "-.", ":"],
                     help="차트의 선 스타일을 선택합니다."
                 )
+                download_format = st.sidebar.selectbox(
+                    "다운로드 형식:",
+                    ["png", "svg", "pdf"],
+                    help="차트를 내려받을 파일 형식을 선택합니다."
+                )
             if chart_type == "도수분포표":
                 # 도수분포표 열 이름 설정
                 class_interval_label = st.sidebar.text_input(
@@ -211,7 +241,7 @@ with col4:
 
 # 초기화 버튼 기능
 if reset_btn:
-    st.experimental_rerun()
+    st.rerun()
 
 # 차트 생성
 if generate_btn and data is not None and column is not None:
@@ -223,21 +253,13 @@ if generate_btn and data is not None and column is not None:
             try:
                 if chart_type == "줄기와 잎 그림":
                     # 줄기와 잎 그림 생성
-                    df = data[column].dropna()
-                    stems = (df // stem_unit).astype(int)
-                    leaves = (df % stem_unit).astype(int)
-                    stem_leaf = pd.DataFrame({'줄기': stems, '잎': leaves})
-                    stem_leaf.sort_values(by=['줄기', '잎'], inplace=True)
-                    grouped = stem_leaf.groupby('줄기')['잎'].apply(lambda x: ' '.join(x.astype(str))).reset_index()
+                    grouped = stem_and_leaf(data[column], stem_unit, leaf_unit, stem_split)
                     st.write("**줄기와 잎 그림**")
                     st.dataframe(grouped.style.hide(axis='index'))
                 elif chart_type == "도수분포표":
                     # 도수분포표 생성
-                    bins = np.arange(bin_start, data[column].max() + bin_width, bin_width)
-                    labels = [f"{bins[i]} ~ {bins[i+1]}" for i in range(len(bins)-1)]
-                    freq_series = pd.cut(data[column], bins=bins, labels=labels, right=False)
-                    freq_table = freq_series.value_counts().sort_index().reset_index()
-                    freq_table.columns = [class_interval_label, frequency_label]
+                    binning = load_binning(file_hash, column, bin_start, bin_width, _values=data[column])
+                    freq_table = frequency_table(binning, class_interval_label, frequency_label)
                     st.write("**도수분포표**")
                     st.dataframe(freq_table.style.hide(axis='index'))
                     # 도수분포표 다운로드 기능 추가
@@ -251,36 +273,20 @@ if generate_btn and data is not None and column is not None:
 
                 else:
                     # 히스토그램, 도수분포다각형 또는 히스토그램+도수분포다각형 생성
-                    bins = np.arange(bin_start, data[column].max() + bin_width, bin_width)
-                    fig, ax = plt.subplots()
-                    if chart_type == "히스토그램":
-                        ax.hist(data[column], bins=bins, color=color, edgecolor='black')
-                    elif chart_type == "도수분포다각형":
-                        counts, bins = np.histogram(data[column], bins=bins)
-                        bin_centers = 0.5 * (bins[:-1] + bins[1:])
-                        ax.plot(bin_centers, counts, linestyle=line_style, color=line_color)
-                    elif chart_type == "히스토그램+도수분포다각형":
-                        ax.hist(data[column], bins=bins, color=color, edgecolor='black', alpha=0.5)
-                        counts, bins = np.histogram(data[column], bins=bins)
-                        bin_centers = 0.5 * (bins[:-1] + bins[1:])
-                        ax.plot(bin_centers, counts, linestyle=line_style, color=line_color)
-                    ax.set_xlabel(x_label)
-                    ax.set_ylabel(y_label)
-                    ax.set_title(chart_title)
-                    ax.yaxis.set_major_locator(plt.MaxNLocator(integer=True))  # y축을 정수로
-                    st.pyplot(fig)
-                    # 차트 다운로드
-                    buf = BytesIO()
-                    fig.savefig(buf, format="png")
-                    buf.seek(0)
+                    binning = load_binning(file_hash, column, bin_start, bin_width, _values=data[column])
+                    if not binning.counts.any():
+                        raise ValueError("계급의 시작 값 이상인 데이터가 없습니다.")
+                    chart_key = (file_hash, column, chart_type, bin_start, bin_width, x_label, y_label, chart_title, color, line_color, line_style)
+                    png = render_chart_image(*chart_key, "png", _binning=binning)
+                    st.image(png)
+                    # 차트 다운로드 (PNG 는 화면에 표시한 이미지를 그대로 사용)
+                    chart_file = png if download_format == "png" else render_chart_image(*chart_key, download_format, _binning=binning)
                     st.download_button(
                         label="차트 다운로드",
-                        data=buf,
-                        file_name="chart.png",
-                        mime="image/png"
+                        data=chart_file,
+                        file_name=f"chart.{download_format}",
+                        mime=MIME_TYPES[download_format]
                     )
-                    buf.close()
-                    plt.close(fig)
             except Exception as e:
                 st.error(f"차트를 생성하는 데 오류가 발생했습니다: {e}")
 else:
@@ -291,6 +297,49 @@ else:
     else:
         st.info("필요한 옵션을 선택하고 '차트 생성'을 클릭하세요.")
 
+# 여러 열 한 번에 내보내기
+if data is not None and column is not None:
+    with st.expander("📦 여러 열 한 번에 내보내기"):
+        batch_columns = st.multiselect(
+            "내보낼 컬럼:",
+            numeric_columns,
+            default=numeric_columns,
+            help="선택한 컬럼마다 현재 설정으로 차트와 도수분포표를 만들어 ZIP 파일 하나로 묶습니다."
+        )
+        if chart_type == "줄기와 잎 그림":
+            batch_options = dict(bin_width=None, bin_start=None, style={}, stem_options=(stem_unit, leaf_unit, stem_split))
+        else:
+            per_column_start = st.checkbox("컬럼마다 최솟값에서 계급 시작", value=True)
+            if chart_type == "도수분포표":
+                style = {"class_interval_label": class_interval_label, "frequency_label": frequency_label}
+            else:
+                style = {"y_label": y_label, "color": color, "line_color": line_color, "line_style": line_style}
+            batch_options = dict(bin_width=bin_width, bin_start=None if per_column_start else bin_start, style=style, stem_options=None)
+        # 파일, 컬럼, 설정이 바뀌면 예전 데이터로 만든 ZIP 을 내려받지 않도록 지움
+        batch_key = (file_hash, chart_type, tuple(batch_columns), repr(batch_options))
+        if st.session_state.get("batch_zip") and st.session_state["batch_zip"][0] != batch_key:
+            del st.session_state["batch_zip"]
+        if st.button("ZIP 만들기") and batch_columns:
+            progress = st.progress(0.0, text="차트를 만드는 중입니다...")
+            zip_bytes, errors = export_zip(
+                {name: data[name].to_numpy() for name in batch_columns},
+                chart_type,
+                font_path=font_path,
+                on_progress=lambda done, total: progress.progress(done / total, text=f"차트를 만드는 중입니다... ({done}/{total})"),
+                **batch_options
+            )
+            progress.empty()
+            for name, error in errors.items():
+                st.error(f"'{name}' 컬럼을 처리하는 중 오류가 발생했습니다: {error}")
+            st.session_state["batch_zip"] = (batch_key, zip_bytes)
+        if st.session_state.get("batch_zip"):
+            st.download_button(
+                label="ZIP 다운로드",
+                data=st.session_state["batch_zip"][1],
+                file_name="charts.zip",
+                mime="application/zip"
+            )
+
 # 개선 사항 제안 버튼 기능
 if suggest_btn and data is not None and column is not None:
     with st.spinner("개선 사항을 생성 중입니다..."):
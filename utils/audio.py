@@ -0,0 +1,59 @@
+import io
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+# OpenAI TTS 의 response_format="pcm" 출력 형식: 24kHz, 16비트 부호 있는 리틀 엔디언, 모노
+SAMPLE_RATE = 24000
+SAMPLE_DTYPE = np.dtype("<i2")
+MP3_BITRATE = "128k"
+MIME_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav"}
+
+
+def output_format():
+    """ffmpeg 가 있으면 mp3, 없으면 인코더 없이 만들 수 있는 wav."""
+    return "mp3" if shutil.which("ffmpeg") else "wav"
+
+
+def assemble_pcm(clips, gaps_ms, sample_rate=SAMPLE_RATE):
+    """PCM 클립들을 하나의 버퍼에 이어 붙인다. gaps_ms[i] 는 i 번째 클립 앞의 무음 길이(ms)이다.
+
+    전체 길이를 먼저 계산해 0 으로 채운 버퍼를 한 번만 만들고, 각 클립을 제자리에 복사한다.
+    무음은 클립을 놓는 위치를 띄우는 것만으로 들어가므로 따로 만들지 않는다.
+    """
+    gaps = [round(ms * sample_rate / 1000) for ms in gaps_ms]
+    lengths = [len(clip) // SAMPLE_DTYPE.itemsize for clip in clips]
+    buffer = np.zeros(sum(gaps) + sum(lengths), dtype=SAMPLE_DTYPE)
+    offset = 0
+    for clip, gap, length in zip(clips, gaps, lengths):
+        offset += gap
+        buffer[offset:offset + length] = np.frombuffer(clip, dtype=SAMPLE_DTYPE, count=length)
+        offset += length
+    return buffer
+
+
+def encode(buffer, fmt, sample_rate=SAMPLE_RATE):
+    """PCM 버퍼를 fmt("mp3"/"wav") 파일 바이트로 만든다.
+
+    mp3 는 버퍼를 ffmpeg 표준 입력으로 바로 흘려 보내고 표준 출력의 결과를 그대로 돌려주므로
+    중간 wav 파일이나 AudioSegment 복사본을 만들지 않는다.
+    """
+    if fmt == "mp3":
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+             "-f", "mp3", "-b:a", MP3_BITRATE, "pipe:1"],
+            input=memoryview(buffer).cast("B"),
+            capture_output=True,
+            check=True,
+        )
+        return result.stdout
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_DTYPE.itemsize)
+        wav.setframerate(sample_rate)
+        wav.writeframes(memoryview(buffer).cast("B"))
+    return output.getvalue()
@@ -0,0 +1,75 @@
+import os
+import re
+import zipfile
+from concurrent.futures import as_completed
+from io import BytesIO
+
+import numpy as np
+
+from utils.binning import bin_column, frequency_table
+from utils.charts import register_font, render_chart
+from utils.concurrency import process_pool
+from utils.stem_leaf import stem_and_leaf
+
+
+def _init_worker(font_path):
+    # 작업 프로세스마다 폰트는 한 번만 등록
+    register_font(font_path)
+
+
+def _safe_name(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', str(name)).strip('_') or 'column'
+
+
+def render_column_files(column, values, chart_type, bin_width, bin_start, style, stem_options):
+    """열 하나에 대한 (파일 이름, 바이트) 목록을 만든다. 작업 프로세스에서 실행된다.
+
+    bin_start 가 None 이면 열마다 최솟값에서 계급을 시작한다. 도수분포표의 열 이름은 style 의
+    class_interval_label, frequency_label 을 쓴다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return []
+    name = _safe_name(column)
+    if chart_type == "줄기와 잎 그림":
+        table = stem_and_leaf(values, *stem_options)
+        return [(f"{name}_줄기와잎.csv", table.to_csv(index=False).encode("utf-8"))]
+
+    binning = bin_column(values, values.min() if bin_start is None else bin_start, bin_width)
+    table = frequency_table(binning, style.get("class_interval_label", "계급 구간"), style.get("frequency_label", "빈도수"))
+    files = [(f"{name}_도수분포표.csv", table.to_csv(index=False).encode("utf-8"))]
+    if chart_type != "도수분포표" and binning.counts.any():
+        png = render_chart(
+            binning, chart_type, column, style["y_label"], f"{column} {chart_type}",
+            style["color"], style["line_color"], style["line_style"],
+        )
+        files.append((f"{name}_{chart_type}.png", png))
+    return files
+
+
+def export_zip(columns, chart_type, bin_width, bin_start, style, stem_options, font_path, max_workers=None, on_progress=None):
+    """columns ({열 이름: 값 배열}) 의 차트와 도수분포표를 여러 프로세스에서 만들어 ZIP 하나로 묶는다.
+
+    끝나는 열부터 바로 ZIP 에 쓰고, on_progress(완료 수, 전체 수) 를 부른다.
+    (ZIP 바이트, {열 이름: 오류}) 를 돌려준다.
+    """
+    errors = {}
+    buffer = BytesIO()
+    max_workers = max_workers or min(os.cpu_count() or 1, len(columns), 8)
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive, \
+            process_pool(max(1, max_workers), initializer=_init_worker, initargs=(font_path,)) as executor:
+        futures = {
+            executor.submit(render_column_files, column, values, chart_type, bin_width, bin_start, style, stem_options): column
+            for column, values in columns.items()
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            column = futures[future]
+            try:
+                for file_name, content in future.result():
+                    archive.writestr(file_name, content)
+            except Exception as e:
+                errors[column] = e
+            if on_progress is not None:
+                on_progress(done, len(futures))
+    return buffer.getvalue(), errors
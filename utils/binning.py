@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# 나눗셈 오차로 경계값이 아래 계급에 들어가지 않도록 반올림할 소수 자릿수
+ROUND_DECIMALS = 9
+# 계급 구간 표시에 쓰는 최대 소수 자릿수
+LABEL_MAX_DECIMALS = 6
+# 실수로 아주 작은 간격을 넣었을 때 메모리를 다 쓰지 않도록 계급 수 제한
+MAX_BINS = 10_000
+
+# edges: 계급 경계 (계급 수 + 1 개), counts: 계급별 도수
+Binning = namedtuple("Binning", ["edges", "counts"])
+
+
+def bin_indices(values, bin_start, bin_width):
+    """값마다 속하는 계급 번호를 구한다. 계급은 [a, b) (이상 ~ 미만) 이고 bin_start 보다 작은 값은 버린다."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    idx = np.floor(np.round((values - bin_start) / bin_width, ROUND_DECIMALS)).astype(np.int64)
+    return idx[idx >= 0]
+
+
+class BinCounter:
+    """값을 여러 번에 나누어 넣어도 한 번에 센 것과 같은 도수를 누적한다. 계급은 값이 들어오는 대로 늘어난다."""
+
+    def __init__(self, bin_start, bin_width):
+        if bin_width <= 0:
+            raise ValueError("계급 간격은 0보다 커야 합니다.")
+        self.bin_start = bin_start
+        self.bin_width = bin_width
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def add(self, values):
+        idx = bin_indices(values, self.bin_start, self.bin_width)
+        if idx.size:
+            if idx.max() >= MAX_BINS:
+                raise ValueError(f"계급이 {MAX_BINS}개를 넘습니다. 계급 간격이나 시작 값을 확인하세요.")
+            added = np.bincount(idx)
+            if added.size > self.counts.size:
+                self.counts = np.pad(self.counts, (0, added.size - self.counts.size))
+            self.counts[:added.size] += added
+        return self
+
+    def result(self):
+        edges = self.bin_start + self.bin_width * np.arange(self.counts.size + 1)
+        return Binning(edges, self.counts.copy())
+
+
+def bin_column(values, bin_start, bin_width):
+    """메모리에 있는 열을 한 번에 센다."""
+    return BinCounter(bin_start, bin_width).add(values).result()
+
+
+def label_decimals(value):
+    """value 를 나타내는 데 필요한 소수 자릿수. float32 로 줄인 값의 오차(상대 1e-6 미만)는 무시한다."""
+    for decimals in range(LABEL_MAX_DECIMALS):
+        if abs(round(value, decimals) - value) <= 1e-6 * max(1.0, abs(value)):
+            return decimals
+    return LABEL_MAX_DECIMALS
+
+
+def frequency_table(binning, class_interval_label="계급 구간", frequency_label="빈도수"):
+    edges, counts = binning
+    # 유효숫자가 아니라 시작 값과 간격의 소수 자릿수에 맞춰 표시 (큰 값도 지수 표기로 뭉개지지 않게)
+    decimals = 0
+    if len(edges) > 1:
+        decimals = max(label_decimals(float(edges[0])), label_decimals(float(edges[1] - edges[0])))
+    texts = [f"{edge:.{decimals}f}" for edge in np.round(edges, decimals)]
+    labels = [f"{texts[i]} ~ {texts[i + 1]}" for i in range(len(counts))]
+    return pd.DataFrame({class_interval_label: labels, frequency_label: counts})
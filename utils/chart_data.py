@@ -0,0 +1,90 @@
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.storage import CACHE_DIR
+
+try:
+    import pyarrow  # noqa: F401 (Parquet 저장에 필요)
+except ImportError:
+    pyarrow = None
+
+# 한 번 읽은 표를 Parquet 으로 보관하는 폴더
+FRAME_DIR = os.path.join(CACHE_DIR, "frames")
+# 학생 성적 등이 서버에 오래 남지 않도록 보관 기간과 전체 크기를 제한 (오래 안 쓴 파일부터 지움)
+FRAME_TTL = 60 * 60 * 24
+FRAME_MAX_BYTES = 256 * 1024 * 1024
+
+def read_table(data, name):
+    """업로드된 파일 바이트를 확장자에 맞게 DataFrame 으로 읽는다."""
+    if name.endswith(".csv"):
+        return pd.read_csv(io.BytesIO(data))
+    if name.endswith(".xlsx"):
+        return pd.read_excel(io.BytesIO(data), engine="openpyxl")
+    raise ValueError("지원하지 않는 파일 형식입니다. CSV 또는 Excel 파일을 업로드하세요.")
+
+
+def downcast_numeric(df):
+    """정수 열은 가장 작은 정수형으로, 실수 열은 값이 그대로 보존될 때만 float32 로 줄인다."""
+    df = df.copy()
+    for col in df.select_dtypes(include=["integer"]).columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in df.select_dtypes(include=["floating"]).columns:
+        down = pd.to_numeric(df[col], downcast="float")
+        if down.dtype != df[col].dtype and np.array_equal(down.to_numpy(np.float64), df[col].to_numpy(np.float64), equal_nan=True):
+            df[col] = down
+    return df
+
+
+def prune_frames(now=None):
+    """FRAME_TTL 동안 쓰지 않은 파일과, 최근에 쓴 것부터 더해 FRAME_MAX_BYTES 를 넘는 파일을 지운다."""
+    now = now or time.time()
+    try:
+        entries = [entry for entry in os.scandir(FRAME_DIR) if entry.name.endswith(".parquet")]
+    except FileNotFoundError:
+        return
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    used = 0
+    for mtime, size, path in sorted(files, reverse=True):
+        used += size
+        if now - mtime > FRAME_TTL or used > FRAME_MAX_BYTES:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def load_table(file_hash, data, name):
+    """표를 읽어 (DataFrame, 숫자형 열 목록) 을 돌려준다.
+
+    pyarrow 가 있으면 파싱 결과를 내용 해시 이름의 Parquet 파일로 남겨, 서버를 다시 켜도 재파싱하지 않는다.
+    파일은 FRAME_TTL 동안 쓰이지 않으면 지워지고, 전체 크기는 FRAME_MAX_BYTES 를 넘지 않는다.
+    """
+    path = os.path.join(FRAME_DIR, f"{file_hash}.parquet")
+    now = time.time()
+    if pyarrow is not None and os.path.exists(path) and now - os.path.getmtime(path) <= FRAME_TTL:
+        df = pd.read_parquet(path)
+        # 수정 시각을 마지막으로 쓴 시각으로 삼아 자주 쓰는 파일이 남도록
+        os.utime(path, (now, now))
+    else:
+        df = downcast_numeric(read_table(data, name))
+        if pyarrow is not None:
+            try:
+                os.makedirs(FRAME_DIR, exist_ok=True)
+                # 열 이름이 문자열이 아니면 Parquet 으로 저장할 수 없으므로 그때는 건너뜀
+                df.to_parquet(path + ".tmp", index=False)
+                os.replace(path + ".tmp", path)
+                prune_frames(now)
+            except (ValueError, TypeError, OSError):
+                pass
+    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    return df, numeric_columns
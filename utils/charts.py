@@ -0,0 +1,42 @@
+from io import BytesIO
+
+import matplotlib
+import matplotlib.font_manager as fm
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+
+# 다운로드 형식별 MIME 타입
+MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
+
+
+def register_font(font_path):
+    """폰트 파일을 matplotlib 에 등록하고 기본 글꼴로 지정한 뒤 글꼴 이름을 돌려준다."""
+    fm.fontManager.addfont(font_path)
+    font_name = fm.FontProperties(fname=font_path).get_name()
+    matplotlib.rc('font', family=font_name)
+    return font_name
+
+
+def render_chart(binning, chart_type, x_label, y_label, chart_title, color, line_color, line_style, fmt="png"):
+    """utils.binning 으로 센 도수로 히스토그램/도수분포다각형 차트를 그려 fmt 형식의 바이트로 돌려준다.
+
+    pyplot 의 전역 상태를 쓰지 않고 Agg 캔버스에 직접 그리므로 여러 세션에서 동시에 호출해도 된다.
+    """
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    edges, counts = binning
+    if chart_type in ["히스토그램", "히스토그램+도수분포다각형"]:
+        # 이미 센 도수를 가중치로 넣어 데이터를 다시 세지 않음
+        ax.hist(edges[:-1], bins=edges, weights=counts, color=color, edgecolor='black', alpha=0.5 if chart_type != "히스토그램" else None)
+    if chart_type in ["도수분포다각형", "히스토그램+도수분포다각형"]:
+        bin_centers = 0.5 * (edges[:-1] + edges[1:])
+        ax.plot(bin_centers, counts, linestyle=line_style, color=line_color)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(chart_title)
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))  # y축을 정수로
+    buf = BytesIO()
+    fig.savefig(buf, format=fmt)
+    return buf.getvalue()
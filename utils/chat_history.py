@@ -0,0 +1,81 @@
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 요청 하나에 넣을 대화 기록의 기본 토큰 한도
+DEFAULT_HISTORY_BUDGET = 6000
+# 메시지마다 붙는 role 등의 부가 토큰
+MESSAGE_OVERHEAD = 4
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_MAX_TOKENS = 500
+
+SUMMARY_PROMPT = """다음은 지금까지의 대화 요약과 그 뒤에 이어진 대화입니다.
+기존 요약에 새 대화 내용을 반영하여 갱신된 요약을 작성하세요.
+사용자의 요청, 정해진 사실과 결론, 아직 해결되지 않은 질문을 빠짐없이 간결하게 남기세요.
+
+[기존 요약]
+{summary}
+
+[새 대화]
+{conversation}"""
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # 인코딩 파일은 처음 쓸 때 내려받으므로, 외부망이 막힌 서버에서는 어림값을 쓴다
+        return None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text):
+    """text 의 토큰 수. tiktoken 을 쓸 수 없으면 UTF-8 바이트 길이로 어림한다."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def window_start(messages, budget):
+    """messages 의 끝에서부터 budget 안에 들어가는 만큼 거슬러 올라가 시작 인덱스를 돌려준다.
+
+    마지막 메시지 하나는 한도를 넘어도 항상 포함한다.
+    """
+    start = len(messages)
+    used = 0
+    while start > 0:
+        cost = message_tokens(messages[start - 1])
+        if used + cost > budget and start < len(messages):
+            break
+        used += cost
+        start -= 1
+    return start
+
+
+def update_summary(client, summary, messages, model=SUMMARY_MODEL):
+    """기존 요약에 새로 밀려난 messages 만 반영해 요약을 갱신한다."""
+    conversation = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{
+            "role": "user",
+            "content": SUMMARY_PROMPT.format(summary=summary or "(없음)", conversation=conversation),
+        }],
+        max_tokens=SUMMARY_MAX_TOKENS,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def summary_message(summary):
+    return {"role": "system", "content": f"지금까지의 대화 요약:\n{summary}"}
@@ -0,0 +1,63 @@
+import importlib.machinery
+import multiprocessing
+import multiprocessing.context
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# 동시 실행 기본값
+DEFAULT_MAX_WORKERS = 4
+# fork 는 리눅스에서만 쓴다. macOS 는 여러 스레드가 도는 프로세스를 fork 하면 시스템 라이브러리가 죽을 수 있다
+USE_FORK = sys.platform.startswith("linux")
+
+
+class _PageSafeSpawnProcess(multiprocessing.context.SpawnProcess):
+    """페이지 스크립트를 다시 실행하지 않는 spawn 작업 프로세스.
+
+    spawn 은 새 프로세스에서 부모의 __main__ 을 다시 불러오는데, Streamlit 에서는 __main__ 이
+    실행 중인 페이지 스크립트라 작업 프로세스마다 페이지 전체가 다시 실행된다. __main__ 에 이름이
+    "__main__" 인 spec 을 달아 두면 multiprocessing 은 __main__ 을 다시 불러오지 않는다.
+    작업 함수는 utils 모듈에 있어야 한다 (페이지에서 정의한 함수는 작업 프로세스에서 찾을 수 없음).
+    """
+
+    def start(self):
+        main = sys.modules.get("__main__")
+        if main is not None and getattr(main, "__spec__", None) is None:
+            main.__spec__ = importlib.machinery.ModuleSpec("__main__", None)
+        super().start()
+
+
+class _PageSafeSpawnContext(multiprocessing.context.SpawnContext):
+    Process = _PageSafeSpawnProcess
+
+
+def process_pool(max_workers, **kwargs):
+    """페이지 스크립트 안에서 쓸 수 있는 프로세스 풀.
+
+    리눅스에서는 fork 로 작업 프로세스를 띄워 페이지 스크립트를 다시 실행하지 않고 부모의 메모리를
+    복사 없이 물려받는다. 다만 Streamlit 서버처럼 여러 스레드가 도는 프로세스를 fork 하면, 다른 스레드가
+    잡고 있던 잠금(로깅, 메모리 할당 등)이 잠긴 채로 복사되어 작업 프로세스가 멈출 수 있다.
+    작업 함수는 순수한 계산(PDF 텍스트 추출, 차트 그리기)만 하고 서버의 잠금을 쓰지 않도록 유지해야 한다.
+
+    다른 운영체제에서는 spawn 을 쓰되, 작업 프로세스가 페이지 스크립트(__main__)를 다시 실행하지 않도록 한다.
+    """
+    context = multiprocessing.get_context("fork") if USE_FORK else _PageSafeSpawnContext()
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context, **kwargs)
+
+
+def fan_out(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """items 각각에 func 를 스레드 풀에서 실행하고, 끝나는 순서대로 (인덱스, 결과, 예외) 를 돌려준다.
+
+    한 항목의 예외는 해당 항목에만 담기고 나머지 작업은 계속 진행된다.
+    func 는 작업 스레드에서 실행되므로 st.* 를 호출하면 안 된다. 화면 갱신은 호출한 쪽에서 한다.
+    """
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        futures = {executor.submit(func, item): idx for idx, item in enumerate(items)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                yield idx, future.result(), None
+            except Exception as e:
+                yield idx, None, e
@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import time
+import uuid
+from collections import namedtuple
+from contextlib import closing
+
+import streamlit as st
+
+from utils.storage import DATA_DIR
+
+# 대화 하나의 정보. summary 는 요청 예산 밖으로 밀려난 앞부분 메시지의 요약, summarized_count 는 요약에 반영된 메시지 수
+Conversation = namedtuple("Conversation", ["id", "title", "created_at", "updated_at", "summary", "summarized_count"])
+TITLE_LENGTH = 40
+
+
+class ConversationStore:
+    """채팅 대화를 SQLite 에 저장한다.
+
+    메시지는 (대화 ID, 순번) 으로 이어 붙이기만 하고 고치지 않으므로, 긴 대화도 새 메시지 하나만 쓰고
+    필요한 구간만 순번 범위로 읽는다. 대화 목록의 제목, 갱신 시각, 요약은 conversations 표에 둔다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                " id TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " summary TEXT NOT NULL DEFAULT '',"
+                " summarized_count INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " conversation_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " role TEXT NOT NULL,"
+                " content TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (conversation_id, seq))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS conversations_updated_at ON conversations (updated_at)")
+
+    def _connect(self):
+        # 자동 커밋 모드로 열고, 여러 문장을 묶는 쓰기는 BEGIN IMMEDIATE 로 직접 묶는다
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def create(self, title):
+        """새 대화를 만들고 ID 를 돌려준다."""
+        conversation_id = uuid.uuid4().hex
+        now = time.time()
+        title = " ".join(title.split())
+        if len(title) > TITLE_LENGTH:
+            title = title[:TITLE_LENGTH] + "…"
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO conversations (id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (conversation_id, title or "새 대화", now, now),
+            )
+        return conversation_id
+
+    def get(self, conversation_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, title, created_at, updated_at, summary, summarized_count FROM conversations WHERE id = ?",
+                (conversation_id,),
+            ).fetchone()
+        return Conversation(*row) if row is not None else None
+
+    def get_many(self, conversation_ids):
+        """주어진 ID 의 대화들을 최근에 이어진 순서대로. 없는 ID 는 건너뛴다."""
+        if not conversation_ids:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, title, created_at, updated_at, summary, summarized_count FROM conversations"
+                f" WHERE id IN ({', '.join('?' * len(conversation_ids))}) ORDER BY updated_at DESC",
+                list(conversation_ids),
+            ).fetchall()
+        return [Conversation(*row) for row in rows]
+
+    def append(self, conversation_id, role, content):
+        """메시지를 대화 끝에 덧붙이고 순번을 돌려준다."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (seq,) = conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?", (conversation_id,)
+                ).fetchone()
+                conn.execute(
+                    "INSERT INTO messages (conversation_id, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (conversation_id, seq, role, content, now),
+                )
+                conn.execute("UPDATE conversations SET updated_at = ? WHERE id = ?", (now, conversation_id))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return seq
+
+    def count(self, conversation_id):
+        with closing(self._connect()) as conn:
+            (count,) = conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+        return count
+
+    def messages(self, conversation_id, start=0, stop=None):
+        """순번 [start, stop) 의 메시지를 {"role", "content"} 목록으로 읽는다."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (conversation_id, start, stop if stop is not None else 2 ** 62),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def set_summary(self, conversation_id, summary, summarized_count):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE conversations SET summary = ?, summarized_count = ? WHERE id = ?",
+                (summary, summarized_count, conversation_id),
+            )
+
+
+@st.cache_resource(show_spinner=False)
+def get_conversation_store():
+    """모든 세션이 함께 쓰는 대화 저장소."""
+    return ConversationStore(os.path.join(DATA_DIR, "conversations.sqlite3"))
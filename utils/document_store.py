@@ -0,0 +1,188 @@
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import streamlit as st
+
+from utils.retrieval import DocumentIndex
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ("parts", "total_pages", "complete", "error", "index", "index_pages", "size", "refs", "index_lock")
+
+    def __init__(self, total_pages, refs=0):
+        # 쪽마다 추출된 텍스트. 추출 스레드가 한 쪽씩 덧붙인다
+        self.parts = []
+        self.total_pages = total_pages
+        self.complete = False
+        self.error = None
+        self.index = None
+        self.index_pages = 0
+        self.size = 0
+        self.refs = refs
+        # 같은 문서를 여러 세션이 동시에 물어봐도 색인은 한 번만 만들도록 문서마다 잠금
+        self.index_lock = threading.Lock()
+
+
+class DocumentHandle:
+    """세션이 들고 있는 문서 참조. 텍스트 대신 내용 해시만 가진다.
+
+    release() 를 부르거나 세션 상태와 함께 가비지 컬렉션되면 참조 수가 줄어든다.
+    """
+
+    def __init__(self, store, key):
+        self.key = key
+        self._store = store
+        self._finalizer = weakref.finalize(self, store.release, key)
+
+    @property
+    def text(self):
+        return self._store.text(self.key)
+
+    @property
+    def index(self):
+        return self._store.index(self.key)
+
+    @property
+    def progress(self):
+        """(추출된 쪽수, 전체 쪽수)"""
+        return self._store.progress(self.key)
+
+    @property
+    def complete(self):
+        return self._store.entry(self.key).complete
+
+    @property
+    def error(self):
+        return self._store.entry(self.key).error
+
+    def release(self):
+        self._finalizer()
+
+
+class DocumentStore:
+    """프로세스 전체가 함께 쓰는 문서 저장소. 내용 해시로 문서를 한 번만 보관한다.
+
+    세션은 acquire() 가 돌려준 DocumentHandle 만 들고 있으므로 메모리는 세션 수가 아니라
+    서로 다른 문서 수에 비례한다. 텍스트는 문서마다 백그라운드 스레드 하나가 한 쪽씩 채우므로
+    추출이 끝나기 전에도 이미 추출된 쪽으로 질문할 수 있다.
+    전체 크기가 max_bytes 를 넘으면 아무 세션도 쓰지 않는 문서부터 오래된 순서로 제거한다.
+    쓰고 있거나 추출 중인 문서는 제거하지 않는다.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, key, loader, total_pages):
+        """key 문서의 핸들을 바로 돌려준다.
+
+        저장소에 없거나 이전 추출이 실패했으면 loader() 가 돌려주는 쪽별 텍스트 반복자를
+        백그라운드 스레드에서 소비해 문서를 채운다.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.error is not None:
+                # 실패한 항목을 들고 있는 세션의 참조 수는 새 항목으로 옮김
+                refs = 0
+                if entry is not None:
+                    self._bytes -= entry.size
+                    refs = entry.refs
+                entry = self._entries[key] = _Entry(total_pages, refs)
+                threading.Thread(target=self._fill, args=(entry, loader), name=f"document-{key[:12]}", daemon=True).start()
+            entry.refs += 1
+            self._entries.move_to_end(key)
+        return DocumentHandle(self, key)
+
+    def _fill(self, entry, loader):
+        try:
+            for page_text in loader():
+                size = sys.getsizeof(page_text)
+                with self._lock:
+                    entry.parts.append(page_text)
+                    entry.size += size
+                    self._bytes += size
+        except Exception as e:
+            with self._lock:
+                entry.error = e
+            return
+        with self._lock:
+            entry.complete = True
+            self._evict()
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs <= 0 and entry.error is not None:
+                # 추출에 실패한 항목은 바로 정리
+                self._bytes -= entry.size
+                del self._entries[key]
+            else:
+                self._evict()
+
+    def entry(self, key):
+        with self._lock:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def text(self, key):
+        """지금까지 추출된 쪽들의 텍스트."""
+        with self._lock:
+            self._entries.move_to_end(key)
+            parts = list(self._entries[key].parts)
+        return ''.join(parts)
+
+    def progress(self, key):
+        with self._lock:
+            entry = self._entries[key]
+            return len(entry.parts), entry.total_pages
+
+    def index(self, key):
+        """문서의 검색 색인. 추출된 쪽이 늘었을 때만 다시 만들고 문서와 함께 제거된다."""
+        entry = self.entry(key)
+        with entry.index_lock:
+            with self._lock:
+                parts = list(entry.parts)
+            if entry.index is None or entry.index_pages != len(parts):
+                index = DocumentIndex(''.join(parts))
+                with self._lock:
+                    # 색인 크기도 저장소 한도에 포함
+                    added = index.nbytes - (entry.index.nbytes if entry.index is not None else 0)
+                    entry.size += added
+                    self._bytes += added
+                    entry.index, entry.index_pages = index, len(parts)
+                    self._evict()
+            return entry.index
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._entries),
+                "extracting": sum(not entry.complete and entry.error is None for entry in self._entries.values()),
+                "bytes": self._bytes,
+                "references": sum(entry.refs for entry in self._entries.values()),
+            }
+
+    def _evict(self):
+        # self._lock 을 잡은 상태에서 호출
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refs <= 0 and entry.complete:
+                self._bytes -= entry.size
+                del self._entries[key]
+
+
+@st.cache_resource(show_spinner=False)
+def get_document_store():
+    """PDF 페이지의 모든 세션이 공유하는 문서 저장소."""
+    return DocumentStore()
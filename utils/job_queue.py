@@ -0,0 +1,205 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import streamlit as st
+
+from utils.concurrency import DEFAULT_MAX_WORKERS, fan_out
+from utils.response_cache import make_key
+from utils.storage import DATA_DIR
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+
+class JobQueue:
+    """SQLite 에 저장하는 작업 대기열. 작업(job)은 순서가 있는 과제(task) 목록이다.
+
+    과제는 내용(payload)의 해시로 식별하므로 같은 과제를 다시 넣어도 이미 끝난 것은 다시 실행하지 않는다.
+    서버가 중간에 멈추면 실행 중이던 과제는 다음 시작 때 대기 상태로 돌아간다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, created_at REAL NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " result TEXT,"
+                " error TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_tasks ("
+                " job_id TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " task_key TEXT NOT NULL,"
+                " PRIMARY KEY (job_id, position))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)")
+            # 이전 실행에서 끝나지 못한 과제는 다시 대기 상태로
+            conn.execute("UPDATE tasks SET status = ? WHERE status = ?", (PENDING, RUNNING))
+
+    def _connect(self):
+        # 자동 커밋 모드로 열고, 여러 문장을 묶는 쓰기는 BEGIN IMMEDIATE 로 직접 묶는다
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def submit(self, kind, payloads):
+        """payloads 순서대로 과제를 넣고 작업 ID 를 돌려준다. 같은 목록이면 같은 작업 ID 가 된다.
+
+        실패했던 과제는 다시 대기 상태로 돌리고, 끝난 과제는 그대로 둔다.
+        """
+        now = time.time()
+        rows = [(make_key(kind, payload), json.dumps(payload, ensure_ascii=False, sort_keys=True)) for payload in payloads]
+        job_id = make_key(kind, [key for key, _ in rows])
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT OR IGNORE INTO jobs (id, kind, created_at) VALUES (?, ?, ?)", (job_id, kind, now))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (key, payload, status, updated_at) VALUES (?, ?, ?, ?)",
+                    [(key, payload, PENDING, now) for key, payload in rows],
+                )
+                conn.executemany(
+                    "UPDATE tasks SET status = ?, error = NULL, updated_at = ? WHERE key = ? AND status = ?",
+                    [(PENDING, now, key, ERROR) for key, _ in rows],
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO job_tasks (job_id, position, task_key) VALUES (?, ?, ?)",
+                    [(job_id, position, key) for position, (key, _) in enumerate(rows)],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self, job_id):
+        """작업의 대기 중인 과제를 실행 중으로 바꾸고 (키, payload) 목록으로 돌려준다."""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT DISTINCT t.key, t.payload FROM job_tasks j JOIN tasks t ON t.key = j.task_key"
+                    " WHERE j.job_id = ? AND t.status = ? ORDER BY j.position",
+                    (job_id, PENDING),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE tasks SET status = ?, updated_at = ? WHERE key = ?",
+                    [(RUNNING, time.time(), key) for key, _ in rows],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return [(key, json.loads(payload)) for key, payload in rows]
+
+    def finish(self, key, result=None, error=None):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, updated_at = ? WHERE key = ?",
+                (ERROR if error is not None else DONE, result, error, time.time(), key),
+            )
+
+    def progress(self, job_id):
+        """상태별 과제 수. 예: {"done": 120, "pending": 180}"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT t.status, COUNT(*) FROM job_tasks j JOIN tasks t ON t.key = j.task_key WHERE j.job_id = ? GROUP BY t.status",
+                (job_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def results(self, job_id):
+        """작업 순서대로 (상태, 결과, 오류) 목록."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT t.status, t.result, t.error FROM job_tasks j JOIN tasks t ON t.key = j.task_key WHERE j.job_id = ? ORDER BY j.position",
+                (job_id,),
+            ).fetchall()
+
+    def unfinished_jobs(self, kind):
+        """대기 중인 과제가 남은 작업 ID 목록 (오래된 순)."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT jobs.id, jobs.created_at FROM jobs"
+                " JOIN job_tasks j ON j.job_id = jobs.id JOIN tasks t ON t.key = j.task_key"
+                " WHERE jobs.kind = ? AND t.status IN (?, ?) ORDER BY jobs.created_at",
+                (kind, PENDING, RUNNING),
+            ).fetchall()
+        return [job_id for job_id, _ in rows]
+
+
+class JobRunner:
+    """작업마다 백그라운드 스레드 하나로 대기 중인 과제를 동시에 처리한다.
+
+    스크립트 실행과 상관없이 서버 프로세스 안에서 계속 돌기 때문에 다시 실행하거나 탭을 닫아도 멈추지 않는다.
+    handler(payload) 는 결과 문자열을 돌려주며 작업 스레드에서 실행되므로 st.* 를 호출하면 안 된다.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+        self._threads = {}
+        self._resumed_kinds = set()
+        self._lock = threading.Lock()
+
+    def start(self, job_id, handler, max_workers=DEFAULT_MAX_WORKERS):
+        """작업을 시작한다. 이미 돌고 있으면 아무것도 하지 않는다."""
+        with self._lock:
+            if self.is_running(job_id):
+                return False
+            thread = threading.Thread(target=self._run, args=(job_id, handler, max_workers), name=f"job-{job_id[:12]}", daemon=True)
+            self._threads[job_id] = thread
+            thread.start()
+        return True
+
+    def resume(self, kind, handler, max_workers=DEFAULT_MAX_WORKERS):
+        """서버가 다시 시작되어 멈춘 kind 작업들을 이어서 처리한다. 프로세스마다 kind 별로 한 번만 확인한다."""
+        with self._lock:
+            if kind in self._resumed_kinds:
+                return
+            self._resumed_kinds.add(kind)
+        for job_id in self.queue.unfinished_jobs(kind):
+            self.start(job_id, handler, max_workers)
+
+    def is_finished(self, job_id):
+        """대기 중이거나 실행 중인 과제가 없으면 True."""
+        progress = self.queue.progress(job_id)
+        return not progress.get(PENDING) and not progress.get(RUNNING)
+
+    def is_running(self, job_id):
+        thread = self._threads.get(job_id)
+        return thread is not None and thread.is_alive()
+
+    def _run(self, job_id, handler, max_workers):
+        # 도는 동안 다시 대기 상태가 된 과제(다시 생성을 눌러 재시도하는 실패 과제 등)도 처리하도록
+        # 남은 과제가 없을 때까지 가져온다. 마지막 확인과 스레드 정리는 start() 와 같은 잠금 안에서 해서,
+        # 그 뒤에 들어온 과제는 start() 가 새 스레드로 처리한다
+        while True:
+            with self._lock:
+                tasks = self.queue.claim(job_id)
+                if not tasks:
+                    self._threads.pop(job_id, None)
+                    return
+            for idx, result, error in fan_out(lambda task: handler(task[1]), tasks, max_workers):
+                key = tasks[idx][0]
+                if error is not None:
+                    self.queue.finish(key, error=str(error))
+                else:
+                    self.queue.finish(key, result=result)
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_runner():
+    """모든 세션이 함께 쓰는 작업 대기열과 실행기."""
+    return JobRunner(JobQueue(os.path.join(DATA_DIR, "jobs.sqlite3")))
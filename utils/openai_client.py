@@ -0,0 +1,58 @@
+import httpx
+import streamlit as st
+from openai import OpenAI
+
+from utils.telemetry import InstrumentedClient, count_request
+
+# 응답 전체를 기다리는 최대 시간(초)과 연결 시도 최대 시간(초)
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# 429/5xx/연결 오류 시 지수 백오프로 다시 시도하는 횟수
+DEFAULT_MAX_RETRIES = 4
+# 모든 세션이 함께 쓰는 연결 풀 크기
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 60.0
+
+
+@st.cache_resource(show_spinner=False)
+def get_shared_client():
+    """프로세스 전체에서 하나만 만들어 모든 페이지와 세션이 공유하는 OpenAI 클라이언트.
+
+    secrets 의 [OPENAI] 섹션에서 TIMEOUT, CONNECT_TIMEOUT, MAX_RETRIES, BASE_URL 을 선택적으로 읽는다.
+    """
+    settings = st.secrets["OPENAI"]
+    timeout = httpx.Timeout(
+        float(settings.get("TIMEOUT", DEFAULT_TIMEOUT)),
+        connect=float(settings.get("CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+    )
+    http_client = httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        # 재시도를 포함해 실제로 나간 요청 수를 호출 기록에 남김
+        event_hooks={"request": [count_request]},
+    )
+    # 재시도는 openai 클라이언트가 429, 408, 409, 5xx 와 연결 오류에 대해 지수 백오프로 처리한다
+    return OpenAI(
+        api_key=settings["OPENAI_API_KEY"],
+        base_url=settings.get("BASE_URL"),
+        timeout=timeout,
+        max_retries=int(settings.get("MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        http_client=http_client,
+    )
+
+
+def get_client(page):
+    """공유 클라이언트에 호출 기록(지연 시간, 토큰 수 등)을 붙여 page 이름으로 돌려준다."""
+    return InstrumentedClient(get_shared_client(), page)
+
+
+def stream_text(stream):
+    """stream=True 로 받은 채팅 응답에서 새로 생성된 텍스트 조각만 꺼낸다."""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
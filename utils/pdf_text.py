@@ -0,0 +1,77 @@
+import io
+import os
+from collections import deque
+
+import pdfplumber
+
+from utils.concurrency import process_pool
+
+# 이 쪽수보다 적으면 프로세스 풀을 띄우는 비용이 더 크므로 한 프로세스에서 추출
+MIN_PAGES_FOR_POOL = 24
+# 작업 하나가 맡는 최대 쪽수
+PAGES_PER_TASK = 16
+# 작업자 한 명당 동시에 맡겨 두는 작업 수 (결과가 쌓여 메모리가 커지지 않도록 제한)
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+
+def count_pages(data):
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+def iter_page_range(data, start, stop):
+    """[start, stop) 쪽의 텍스트를 한 쪽씩 내준다. 텍스트가 없는 쪽은 빈 문자열이다."""
+    with pdfplumber.open(io.BytesIO(data), pages=range(start + 1, stop + 1)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            # pdfplumber 는 페이지마다 파싱 결과를 캐시하므로 바로 비워준다
+            page.flush_cache()
+            yield page_text + "\n\n" if page_text else ""
+
+
+def extract_page_texts(data, start, stop):
+    return list(iter_page_range(data, start, stop))
+
+
+# 작업 프로세스가 맡은 PDF 바이트. 작업마다 PDF 전체를 파이프로 보내지 않도록 풀을 띄울 때 한 번만 넘긴다
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _extract_worker_range(start, stop):
+    return extract_page_texts(_worker_data, start, stop)
+
+
+def iter_page_texts(data, start=0, stop=None, max_workers=None):
+    """[start, stop) 쪽의 텍스트를 쪽 순서대로 하나씩 내준다.
+
+    쪽수가 많으면 쪽 범위별로 프로세스 풀에 나누되, 한 번에 맡기는 작업 수를 제한해
+    작업 중인 메모리가 전체 쪽수와 상관없이 일정하도록 한다. PDF 바이트는 작업자를 띄울 때 한 번만
+    넘기므로(fork 면 복사 없이 물려받음) 작업마다 파일 크기만큼의 사본이 생기지 않는다.
+    """
+    stop = count_pages(data) if stop is None else stop
+    num_pages = stop - start
+    if num_pages < MIN_PAGES_FOR_POOL:
+        yield from iter_page_range(data, start, stop)
+        return
+
+    max_workers = max_workers or min(os.cpu_count() or 1, 8)
+    pages_per_task = min(PAGES_PER_TASK, -(-num_pages // max_workers))
+    starts = iter(range(start, stop, pages_per_task))
+
+    with process_pool(max_workers, initializer=_init_worker, initargs=(data,)) as executor:
+        pending = deque()
+        for task_start in starts:
+            pending.append(executor.submit(_extract_worker_range, task_start, min(task_start + pages_per_task, stop)))
+            if len(pending) >= max_workers * TASKS_IN_FLIGHT_PER_WORKER:
+                break
+        while pending:
+            texts = pending.popleft().result()
+            task_start = next(starts, None)
+            if task_start is not None:
+                pending.append(executor.submit(_extract_worker_range, task_start, min(task_start + pages_per_task, stop)))
+            yield from texts
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import streamlit as st
+
+from utils.storage import CACHE_DIR
+
+DEFAULT_TTL = 60 * 60 * 24 * 14
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# 듣기평가 음성 클립은 학기 내내 다시 쓰이므로 오래, 크게 보관
+CLIP_TTL = 60 * 60 * 24 * 180
+CLIP_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def make_key(*parts):
+    """모델, 시스템 역할, 프롬프트 등 요청을 결정하는 값들로 캐시 키를 만든다."""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite 기반의 디스크 캐시. 만료 시간(TTL)과 전체 크기 한도(LRU 제거)를 가진다.
+
+    호출마다 연결을 새로 열고 WAL 모드를 쓰므로 여러 세션(스레드)에서 동시에 써도 안전하다.
+    값은 문자열이나 바이트 모두 저장할 수 있다.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def _connect(self):
+        # 자동 커밋 모드로 열고, 쓰기는 BEGIN IMMEDIATE 로 직접 묶는다
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get(self, key):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key, value):
+        now = time.time()
+        size = len(value.encode("utf-8") if isinstance(value, str) else value)
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now),
+                )
+                conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+                # 최근에 쓴 것부터 크기를 누적해서 한도를 넘는 오래된 항목을 지운다
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    " SELECT key FROM ("
+                    "  SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running FROM entries"
+                    " ) WHERE running > ?)",
+                    (self.max_bytes,),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache():
+    """모델 응답 텍스트용 캐시. 모든 세션이 같은 파일을 공유한다."""
+    return ResponseCache(os.path.join(CACHE_DIR, "responses.sqlite3"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_clip_cache():
+    """TTS 음성 클립(PCM 바이트)용 캐시. 클립이 크므로 응답 텍스트와 파일을 나누고 한도를 크게 잡는다."""
+    return ResponseCache(os.path.join(CACHE_DIR, "tts_clips.sqlite3"), ttl=CLIP_TTL, max_bytes=CLIP_MAX_BYTES)
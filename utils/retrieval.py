@@ -0,0 +1,66 @@
+import re
+import sys
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# 청크 길이(글자 수)와 앞뒤 청크가 겹치는 길이
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 150
+# 질문마다 가져올 청크 수
+TOP_K = 5
+
+
+def split_chunks(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """문단 경계를 살려 chunk_size 이하의 청크로 나눈다. 긴 문단은 overlap 만큼 겹치게 자른다."""
+    step = chunk_size - overlap
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for start in range(0, max(len(paragraph) - overlap, 1), step):
+            pieces.append(paragraph[start:start + chunk_size])
+
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > chunk_size:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class DocumentIndex:
+    """문서 하나에 대한 TF-IDF 검색 색인. 한국어는 형태소 분석 없이도 잘 맞도록 글자 n-gram 을 쓴다."""
+
+    def __init__(self, text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+        self.chunks = split_chunks(text, chunk_size, overlap)
+        self.vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), sublinear_tf=True)
+        self.matrix = self.vectorizer.fit_transform(self.chunks) if self.chunks else None
+
+    @property
+    def nbytes(self):
+        """청크, 어휘 사전, 희소 행렬이 차지하는 대략적인 메모리(바이트)."""
+        if self.matrix is None:
+            return 0
+        vocabulary = self.vectorizer.vocabulary_
+        return (
+            sum(sys.getsizeof(chunk) for chunk in self.chunks)
+            + sys.getsizeof(vocabulary) + sum(sys.getsizeof(term) for term in vocabulary)
+            + self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+        )
+
+    def search(self, query, k=TOP_K):
+        """질문과 가장 비슷한 청크 k 개를 문서 순서대로 돌려준다."""
+        if self.matrix is None:
+            return []
+        k = min(k, len(self.chunks))
+        # TF-IDF 벡터는 L2 정규화되어 있으므로 내적이 곧 코사인 유사도
+        scores = (self.matrix @ self.vectorizer.transform([query]).T).toarray().ravel()
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [self.chunks[i] for i in sorted(top)]
@@ -0,0 +1,67 @@
+import io
+
+import pandas as pd
+
+# 명렬표의 열. 머리글이 아래 이름 중 하나면 해당 열로, 아니면 앞에서부터 순서대로 쓴다
+ROSTER_COLUMNS = {
+    "student_name": ["학생 이름", "학생이름", "이름", "성명", "name"],
+    "award_name": ["상의 이름", "상 이름", "상이름", "상", "award"],
+    "student_quality": ["학생의 우수한 점", "우수한 점", "우수한점", "특징", "quality"],
+}
+ROSTER_FIELDS = list(ROSTER_COLUMNS)
+
+
+def empty_roster(rows=0):
+    # 행이 없으면 열이 float 로 추론되어 편집기의 텍스트 열과 맞지 않으므로 object 로 고정
+    return pd.DataFrame({field: [""] * rows for field in ROSTER_FIELDS}, dtype=object)
+
+
+def _read(data, name):
+    if name.endswith(".xlsx"):
+        return pd.read_excel(io.BytesIO(data), engine="openpyxl", dtype=str)
+    if name.endswith(".csv"):
+        # 엑셀에서 저장한 한글 CSV 는 cp949 인 경우가 많음
+        try:
+            return pd.read_csv(io.BytesIO(data), dtype=str, encoding="utf-8-sig")
+        except UnicodeDecodeError:
+            return pd.read_csv(io.BytesIO(data), dtype=str, encoding="cp949")
+    raise ValueError("지원하지 않는 파일 형식입니다. CSV 또는 Excel 파일을 업로드하세요.")
+
+
+def read_roster(data, name):
+    """CSV/Excel 명렬표를 student_name, award_name, student_quality 열의 DataFrame 으로 읽는다."""
+    df = _read(data, name)
+    headers = {str(column).strip().lower(): column for column in df.columns}
+    unmatched = list(df.columns)
+    columns = {}
+    for field, aliases in ROSTER_COLUMNS.items():
+        for alias in aliases:
+            if alias.lower() in headers:
+                columns[field] = headers[alias.lower()]
+                unmatched.remove(columns[field])
+                break
+    for field in ROSTER_COLUMNS:
+        if field not in columns and unmatched:
+            columns[field] = unmatched.pop(0)
+    if "student_name" not in columns:
+        raise ValueError("명렬표에서 학생 이름 열을 찾을 수 없습니다.")
+
+    roster = pd.DataFrame({field: df[columns[field]] if field in columns else "" for field in ROSTER_COLUMNS}, index=df.index)
+    roster = roster.fillna("").apply(lambda column: column.str.strip())
+    # 이름이 빈 행은 버림
+    return roster[roster["student_name"] != ""].reset_index(drop=True)
+
+
+def apply_editor_changes(roster, start, stop, changes):
+    """st.data_editor 가 기록한 변경 내용(수정/추가/삭제)을 명렬표의 [start, stop) 행에 반영한 새 DataFrame.
+
+    changes 의 행 번호는 편집기에 넘긴 쪽 안에서의 위치이다. 수정은 삭제 전 위치 기준이므로 먼저 반영한다.
+    """
+    page = roster.iloc[start:stop].copy()
+    for position, values in changes.get("edited_rows", {}).items():
+        for field, value in values.items():
+            page.iat[int(position), page.columns.get_loc(field)] = "" if value is None else str(value)
+    page = page.drop(page.index[list(changes.get("deleted_rows", []))])
+    added = pd.DataFrame(changes.get("added_rows", []), columns=ROSTER_FIELDS)
+    roster = pd.concat([roster.iloc[:start], page, added, roster.iloc[stop:]], ignore_index=True)
+    return roster.fillna("")
@@ -0,0 +1,103 @@
+import re
+from collections import namedtuple
+
+# 발화 하나. gender 는 "female"/"male", language 는 "ko"/"en", pause_ms 는 발화 뒤에 따로 지정한 쉼(없으면 None)
+Utterance = namedtuple("Utterance", ["question", "gender", "language", "text", "line_no", "pause_ms"])
+# 문제 하나. number 0 은 첫 문제 앞의 안내 방송이다
+Question = namedtuple("Question", ["number", "label", "line_no", "utterances"])
+ParseError = namedtuple("ParseError", ["line_no", "message"])
+Script = namedtuple("Script", ["questions", "errors"])
+
+# 한 행의 종류(쉼 표시, 문제 번호, 화자 표시)를 한 번의 매치로 가린다. 어느 것도 아니면 대사 행이다
+_LINE = re.compile(
+    r"""
+    \s*[\[(]\s*(?:pause|쉼)\s*(?P<pause>\d+(?:\.\d+)?)\s*(?P<unit>ms|s|초)?\s*[\])]\s*$
+    | (?P<label>(?P<number>\d{1,2})(?!\d)\s*\.?\s*번?)\s*(?P<question>.*)
+    | \s*(?P<speaker>[MWmw])\s*:\s*(?P<said>.*)
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+_LETTER = re.compile(r"[a-zA-Z가-힣]")
+# 글자 수를 셀 때 UTF-8 바이트에서 지울 바이트들. 한글 음절(U+AC00~U+D7A3)은 첫 바이트가 0xEA~0xED 이다
+# (이 범위의 다른 글자는 대본에 거의 나오지 않으므로 한글로 셈)
+_NOT_HANGUL_LEAD = bytes(b for b in range(256) if not 0xEA <= b <= 0xED)
+_LATIN = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def detect_language(text):
+    """한글 글자가 영어 알파벳보다 많으면 "ko", 아니면 "en"."""
+    encoded = text.encode("utf-8")
+    hangul = len(encoded.translate(None, _NOT_HANGUL_LEAD))
+    latin = len(encoded) - len(encoded.translate(None, _LATIN))
+    return "ko" if hangul > latin else "en"
+
+
+def parse_script(text):
+    """듣기평가 대본을 한 번 훑어 문제 > 발화 구조(Script)로 바꾼다.
+
+    - 행 처음의 '1번', '2.' 같은 문제 번호는 새 문제를 시작한다.
+    - 'M:'/'W:' 는 새 화자의 발화를 시작하고 이후 성별을 바꾼다.
+    - '[쉼 3초]', '(pause 500ms)' 처럼 한 행에 쓴 쉼 표시는 앞 발화 뒤의 쉼 길이를 정한다.
+    - 표시가 없는 행은 같은 문제의 앞 발화에 이어 붙인다. 글자가 없는 행은 건너뛴다.
+    문제 번호가 건너뛰거나 쉼 표시를 잘못 쓴 경우 등은 행 번호와 함께 errors 에 담는다.
+    """
+    questions = [Question(0, "", 0, [])]
+    errors = []
+    # 이어 붙일 대사 행과 그 발화의 정보. 다음 발화가 시작될 때 하나로 합쳐 Utterance 로 만든다
+    pending = None
+    gender = "female"
+
+    def flush(pause_ms=None):
+        nonlocal pending
+        if pending is not None and pending[3]:
+            question, speaker_gender, line_no, lines = pending
+            utterance_text = " ".join(lines)
+            questions[-1].utterances.append(Utterance(question, speaker_gender, detect_language(utterance_text), utterance_text, line_no, pause_ms))
+        pending = None
+
+    for line_no, raw in enumerate(text.splitlines(), start=1):
+        match = _LINE.match(raw)
+        if match is not None and match.group("pause") is not None:
+            value = float(match.group("pause"))
+            pause_ms = round(value if (match.group("unit") or "").lower() == "ms" else value * 1000)
+            if pending is not None:
+                flush(pause_ms)
+            elif questions[-1].utterances and questions[-1].utterances[-1].pause_ms is None:
+                questions[-1].utterances[-1] = questions[-1].utterances[-1]._replace(pause_ms=pause_ms)
+            else:
+                errors.append(ParseError(line_no, "쉼 표시 앞에 발화가 없습니다."))
+            continue
+        if match is not None and match.group("number") is not None:
+            flush()
+            number = int(match.group("number"))
+            expected = questions[-1].number + 1
+            if number != expected:
+                errors.append(ParseError(line_no, f"문제 번호가 {expected}번이 아니라 {number}번입니다."))
+            label = match.group("label").strip()
+            questions.append(Question(number, label, line_no, []))
+            pending = (number, gender, line_no, [f"{label} {match.group('question').strip()}".strip()])
+            continue
+        if not _LETTER.search(raw):
+            continue
+        if match is not None and match.group("speaker") is not None:
+            flush()
+            gender = "male" if match.group("speaker").upper() == "M" else "female"
+            said = match.group("said").strip()
+            if not said:
+                errors.append(ParseError(line_no, "화자 표시 뒤에 대사가 없습니다."))
+            pending = (questions[-1].number, gender, line_no, [said] if said else [])
+            continue
+        if pending is None:
+            pending = (questions[-1].number, gender, line_no, [])
+        pending[3].append(raw.strip())
+    flush()
+
+    # 안내 방송이 없으면 0번 문제는 뺌
+    if not questions[0].utterances:
+        questions.pop(0)
+    return Script(questions, errors)
+
+
+def iter_utterances(script):
+    for question in script.questions:
+        yield from question.utterances
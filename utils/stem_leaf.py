@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+# 나눗셈 오차(예: 12.5 / 0.1 = 124.999...)를 없애기 위해 반올림할 소수 자릿수
+ROUND_DECIMALS = 6
+
+
+def stem_and_leaf(values, stem_unit=10, leaf_unit=None, split=1):
+    """줄기와 잎 그림 표를 만든다. 반복문 없이 정렬 한 번과 정수 연산으로 계산한다.
+
+    stem_unit: 줄기 한 칸의 크기 (예: 10 이면 37 의 줄기는 3)
+    leaf_unit: 잎 한 칸의 크기 (기본값 stem_unit / 10, 예: 0.1 이면 12.5 의 잎은 5)
+    split: 줄기 하나를 몇 줄로 나눌지 (2 이면 잎 0~4 와 5~9 를 나눔)
+    """
+    leaf_unit = stem_unit / 10 if leaf_unit is None else leaf_unit
+    leaves_per_stem = stem_unit / leaf_unit
+    if leaf_unit <= 0 or abs(leaves_per_stem - round(leaves_per_stem)) > 1e-9 or round(leaves_per_stem) < 2:
+        raise ValueError("줄기의 자릿수는 잎의 단위의 정수배(2배 이상)여야 합니다.")
+    leaves_per_stem = int(round(leaves_per_stem))
+    if leaves_per_stem % split:
+        raise ValueError("줄기를 나누는 수는 줄기 하나에 들어가는 잎의 개수를 나누어떨어지게 해야 합니다.")
+
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return pd.DataFrame({'줄기': [], '잎': []})
+
+    # 잎 단위로 환산한 정수를 한 번만 정렬하면 줄기, 잎 순서로 정렬된다
+    scaled = np.sort(np.floor(np.round(values / leaf_unit, ROUND_DECIMALS)).astype(np.int64))
+    stems, leaves = np.divmod(scaled, leaves_per_stem)
+    keys = stems * split + leaves * split // leaves_per_stem
+    group_keys, starts = np.unique(keys, return_index=True)
+    ends = np.append(starts[1:], scaled.size)
+
+    # 모든 잎을 같은 너비의 숫자 + 공백으로 한 문자열에 써 두고, 줄기마다 구간을 잘라낸다
+    width = len(str(leaves_per_stem - 1))
+    cell = np.full((scaled.size, width + 1), ord(' '), dtype=np.uint8)
+    remainder = leaves.copy()
+    for pos in range(width - 1, -1, -1):
+        remainder, digit = np.divmod(remainder, 10)
+        cell[:, pos] = digit + ord('0')
+    text = cell.tobytes().decode('ascii')
+    step = width + 1
+    leaf_strings = [text[start * step:end * step - 1] for start, end in zip(starts, ends)]
+
+    return pd.DataFrame({'줄기': group_keys // split, '잎': leaf_strings})
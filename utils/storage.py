@@ -0,0 +1,15 @@
+import hashlib
+import os
+
+# 앱 폴더와, 디스크 캐시를 두는 .cache 폴더 (APP_CACHE_DIR 환경 변수로 바꿀 수 있음)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get("APP_CACHE_DIR") or os.path.join(APP_DIR, ".cache")
+# 호출 기록 등 로그 파일을 두는 폴더 (APP_LOG_DIR 환경 변수로 바꿀 수 있음)
+LOG_DIR = os.environ.get("APP_LOG_DIR") or os.path.join(APP_DIR, "logs")
+# 작업 대기열 등 지우면 안 되는 데이터를 두는 폴더 (APP_DATA_DIR 환경 변수로 바꿀 수 있음)
+DATA_DIR = os.environ.get("APP_DATA_DIR") or os.path.join(APP_DIR, "data")
+
+
+def content_hash(data):
+    """업로드 파일 등 바이트 내용의 SHA-256 해시."""
+    return hashlib.sha256(data).hexdigest()
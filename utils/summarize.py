@@ -0,0 +1,105 @@
+from utils.concurrency import DEFAULT_MAX_WORKERS, fan_out
+from utils.response_cache import make_key
+from utils.retrieval import split_chunks
+
+SUMMARY_MODEL = "gpt-4o-mini"
+# 한 번에 요약할 원문 청크 길이(글자 수)
+MAP_CHUNK_SIZE = 6000
+# 한 번의 요청에 합쳐 넣을 부분 요약들의 최대 길이(글자 수)
+REDUCE_INPUT_CHARS = 8000
+# 요약 길이 선택지와 프롬프트에 넣을 설명
+LENGTHS = {
+    "짧게": "3~5문장으로",
+    "보통": "10문장 안팎으로",
+    "자세히": "소제목을 붙여 항목별로 자세하게",
+}
+
+MAP_PROMPT = "다음은 긴 문서의 일부입니다. 핵심 내용, 중요한 개념, 수치와 예시를 빠짐없이 한국어로 간결하게 요약해 주세요."
+REDUCE_PROMPT = "다음은 한 문서를 부분별로 요약한 내용입니다. 중복을 없애고 순서를 살려 하나의 요약으로 한국어로 합쳐 주세요."
+FINAL_PROMPT = "다음은 한 문서를 부분별로 요약한 내용입니다. 이를 바탕으로 문서 전체를 {length} 한국어로 요약해 주세요."
+
+
+def _complete(client, model, instruction, content):
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": instruction},
+            {"role": "user", "content": content},
+        ],
+        temperature=0.3,
+    )
+    return response.choices[0].message.content
+
+
+def _cached_complete(client, cache, model, instruction, content):
+    """같은 지시와 입력은 한 번만 요청한다. 캐시 키는 입력 내용으로 정해지므로 청크 해시와 같다."""
+    key = make_key("summary", model, instruction, content)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return cached
+    result = _complete(client, model, instruction, content)
+    if cache is not None:
+        cache.set(key, result)
+    return result
+
+
+def _group(summaries, limit=REDUCE_INPUT_CHARS):
+    """이어 붙였을 때 limit 을 넘지 않도록 부분 요약들을 순서대로 묶는다.
+
+    요약이 길어도 합치기를 반복할 때마다 묶음 수가 줄도록 묶음마다 최소 두 개씩 넣는다.
+    """
+    groups, current, size = [], [], 0
+    for summary in summaries:
+        if len(current) >= 2 and size + len(summary) > limit:
+            groups.append(current)
+            current, size = [], 0
+        current.append(summary)
+        size += len(summary)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _run_all(func, items, max_workers, on_progress, stage):
+    """items 를 동시에 처리해 순서대로 결과를 돌려준다. 하나라도 실패하면 나머지를 마친 뒤 첫 예외를 다시 던진다."""
+    results = [None] * len(items)
+    errors = []
+    for done, (idx, result, error) in enumerate(fan_out(func, items, max_workers), start=1):
+        if error is not None:
+            errors.append(error)
+        results[idx] = result
+        if on_progress:
+            on_progress(stage, done, len(items))
+    if errors:
+        raise errors[0]
+    return results
+
+
+def summarize_document(client, text, length="보통", focus="", model=SUMMARY_MODEL, cache=None, max_workers=DEFAULT_MAX_WORKERS, on_progress=None):
+    """긴 문서를 청크별로 동시에 요약(map)한 뒤 부분 요약들을 단계적으로 합쳐(reduce) 하나의 요약을 만든다.
+
+    청크 요약과 중간 합치기 결과는 길이·초점과 상관없이 캐시되므로, 길이나 초점만 바꿔 다시 요약하면
+    마지막 단계만 새로 요청한다. 중간에 실패해도 끝난 부분은 캐시에 남아 다시 시도할 때 이어서 진행된다.
+    on_progress(단계, 완료 수, 전체 수) 로 진행 상황을 알린다. 단계는 "map", "reduce", "final" 이다.
+    """
+    chunks = split_chunks(text, MAP_CHUNK_SIZE, 0)
+    if not chunks:
+        return ""
+
+    summaries = _run_all(lambda chunk: _cached_complete(client, cache, model, MAP_PROMPT, chunk), chunks, max_workers, on_progress, "map")
+
+    # 부분 요약이 한 요청에 들어갈 때까지 묶어서 합치기를 반복
+    groups = _group(summaries)
+    while len(groups) > 1:
+        summaries = _run_all(lambda group: _cached_complete(client, cache, model, REDUCE_PROMPT, "\n\n---\n\n".join(group)), groups, max_workers, on_progress, "reduce")
+        groups = _group(summaries)
+
+    instruction = FINAL_PROMPT.format(length=LENGTHS[length])
+    if focus:
+        instruction += f" 특히 '{focus}'에 초점을 맞춰 주세요."
+    if on_progress:
+        on_progress("final", 0, 1)
+    result = _cached_complete(client, cache, model, instruction, "\n\n---\n\n".join(groups[0]))
+    if on_progress:
+        on_progress("final", 1, 1)
+    return result
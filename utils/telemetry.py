@@ -0,0 +1,207 @@
+import atexit
+import collections
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import MemoryHandler, RotatingFileHandler
+
+import pandas as pd
+import streamlit as st
+
+from utils.storage import LOG_DIR
+
+LOG_FILE = os.path.join(LOG_DIR, "openai_calls.jsonl")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# 메모리에 이만큼 모이거나 FLUSH_INTERVAL 초가 지나면 파일에 씀
+BUFFER_CAPACITY = 50
+FLUSH_INTERVAL = 30.0
+# 관리자 패널 통계에 쓰는 최근 기록 수
+RECENT_LIMIT = 5000
+
+
+class TelemetryRecorder:
+    """OpenAI 호출 기록을 메모리에 모았다가 크기별로 돌려쓰는 JSONL 파일에 쓴다. 여러 스레드에서 써도 안전하다."""
+
+    def __init__(self, path=LOG_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        target = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        target.setFormatter(logging.Formatter("%(message)s"))
+        self._handler = MemoryHandler(BUFFER_CAPACITY, flushLevel=logging.CRITICAL + 1, target=target)
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._handler)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.recent = collections.deque(maxlen=RECENT_LIMIT)
+        atexit.register(self.flush)
+
+    def record(self, **fields):
+        fields["ts"] = time.time()
+        self.recent.append(fields)
+        self._logger.info(json.dumps(fields, ensure_ascii=False))
+        with self._lock:
+            due = time.monotonic() - self._last_flush > FLUSH_INTERVAL
+            if due:
+                self._last_flush = time.monotonic()
+        if due:
+            self.flush()
+
+    def flush(self):
+        self._handler.flush()
+
+
+recorder = TelemetryRecorder()
+
+# 스레드마다 실제로 보낸 HTTP 요청 수 (재시도 횟수 계산용)
+_requests = threading.local()
+
+
+def count_request(request):
+    """httpx 요청 훅. 클라이언트가 재시도할 때마다 불린다."""
+    _requests.count = getattr(_requests, "count", 0) + 1
+
+
+def _reset_request_count():
+    _requests.count = 0
+
+
+def _retries():
+    return max(getattr(_requests, "count", 0) - 1, 0)
+
+
+class _CallTimer:
+    def __init__(self, page, endpoint, model):
+        self.fields = {"page": page, "endpoint": endpoint, "model": model, "ttft_s": None,
+                       "prompt_tokens": None, "completion_tokens": None, "retries": 0, "error": None}
+        self.start = time.perf_counter()
+        _reset_request_count()
+
+    def first_token(self):
+        if self.fields["ttft_s"] is None:
+            self.fields["ttft_s"] = round(time.perf_counter() - self.start, 4)
+
+    def usage(self, usage):
+        if usage is not None:
+            self.fields["prompt_tokens"] = usage.prompt_tokens
+            self.fields["completion_tokens"] = usage.completion_tokens
+
+    def finish(self, error=None):
+        self.fields["latency_s"] = round(time.perf_counter() - self.start, 4)
+        if error is not None:
+            self.fields["error"] = f"{type(error).__name__}: {error}"
+        recorder.record(**self.fields)
+
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class InstrumentedClient:
+    """공유 OpenAI 클라이언트를 감싸 채팅/음성 호출마다 지연 시간, 첫 토큰 시간, 토큰 수, 재시도, 오류를 기록한다."""
+
+    def __init__(self, client, page):
+        self._client = client
+        self.page = page
+        self.chat = _Namespace(completions=_Namespace(create=self._chat_create))
+        self.audio = _Namespace(speech=_Namespace(create=self._speech_create))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _chat_create(self, **kwargs):
+        timer = _CallTimer(self.page, "chat", kwargs.get("model"))
+        if kwargs.get("stream"):
+            # 스트리밍에서도 토큰 사용량을 받기 위해 마지막 조각에 usage 를 요청
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        try:
+            response = self._client.chat.completions.create(**kwargs)
+        except Exception as e:
+            timer.fields["retries"] = _retries()
+            timer.finish(e)
+            raise
+        timer.fields["retries"] = _retries()
+        if kwargs.get("stream"):
+            return self._wrap_stream(response, timer)
+        timer.usage(response.usage)
+        timer.finish()
+        return response
+
+    def _wrap_stream(self, stream, timer):
+        error = None
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    timer.first_token()
+                timer.usage(getattr(chunk, "usage", None))
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            timer.finish(error)
+
+    def _speech_create(self, **kwargs):
+        timer = _CallTimer(self.page, "speech", kwargs.get("model"))
+        try:
+            response = self._client.audio.speech.create(**kwargs)
+        except Exception as e:
+            timer.fields["retries"] = _retries()
+            timer.finish(e)
+            raise
+        timer.fields["retries"] = _retries()
+        timer.finish()
+        return response
+
+
+# 통계를 낼 숫자 필드. 스트리밍이 아닌 호출과 음성 합성은 첫 토큰 시간이, 음성 합성은 토큰 수가 없다(None)
+NUMERIC_FIELDS = ["latency_s", "ttft_s", "prompt_tokens", "completion_tokens"]
+
+
+def summarize(records):
+    """페이지별 호출 수, 오류 수, 지연 시간/첫 토큰 시간의 p50·p95, 토큰 합계.
+
+    값이 하나도 없는 칸은 비워 둔다.
+    """
+    if not records:
+        return pd.DataFrame()
+    df = pd.DataFrame(records)
+    # 모두 None 이면 object 열이 되어 quantile 이 실패하므로 실수 열(None → NaN)로 바꿈
+    for field in NUMERIC_FIELDS:
+        df[field] = pd.to_numeric(df[field], errors="coerce") if field in df else float("nan")
+        df[field] = df[field].astype("float64")
+    if "error" not in df:
+        df["error"] = None
+    grouped = df.groupby("page")
+    return pd.DataFrame({
+        "호출": grouped.size(),
+        "오류": grouped["error"].count(),
+        "지연 p50": grouped["latency_s"].quantile(0.5),
+        "지연 p95": grouped["latency_s"].quantile(0.95),
+        "첫 토큰 p50": grouped["ttft_s"].quantile(0.5),
+        "첫 토큰 p95": grouped["ttft_s"].quantile(0.95),
+        "입력 토큰": grouped["prompt_tokens"].sum(min_count=1),
+        "출력 토큰": grouped["completion_tokens"].sum(min_count=1),
+    }).round(3)
+
+
+def show_admin_panel():
+    """secrets 에 ADMIN_PANEL = true 가 있을 때만 사이드바에 호출 통계를 보여준다."""
+    try:
+        enabled = st.secrets.get("ADMIN_PANEL", False)
+    except FileNotFoundError:
+        enabled = False
+    if not enabled:
+        return
+    with st.sidebar.expander("📈 API 호출 통계 (관리자)"):
+        stats = summarize(list(recorder.recent))
+        if stats.empty:
+            st.write("아직 기록된 호출이 없습니다.")
+        else:
+            st.dataframe(stats)
+        if st.button("로그 파일에 지금 쓰기"):
+            recorder.flush()